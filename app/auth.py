@@ -0,0 +1,20 @@
+import secrets
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+
+from .config import settings
+
+security = HTTPBasic()
+
+
+def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)) -> str:
+    correct_username = secrets.compare_digest(
+        credentials.username, settings.auth_username
+    )
+    correct_password = secrets.compare_digest(
+        credentials.password, settings.auth_password
+    )
+    if not (correct_username and correct_password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return credentials.username
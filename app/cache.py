@@ -0,0 +1,199 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping
+
+from .config import settings
+
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    etag: str
+    last_modified: datetime | None
+    body: bytes
+    # Precompressed copies of body keyed by content coding.
+    encoded: Mapping[str, bytes] = field(default_factory=dict)
+
+    def representation(self, encoding: str | None) -> bytes:
+        if encoding is None:
+            return self.body
+        return self.encoded[encoding]
+
+
+class FeedCache:
+    """LRU cache of rendered feeds with single-flight rebuilds.
+
+    Concurrent requests for the same missing snapshot share one build. When
+    an outdated snapshot exists and stale responses are allowed, callers get
+    it immediately while a background thread rebuilds.
+    """
+
+    def __init__(self, max_entries: int, refresh_workers: int = 2) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[Hashable, FeedSnapshot] = OrderedDict()
+        self._builds: dict[tuple[Hashable, str], Future[FeedSnapshot]] = {}
+        # Lookup outcomes for get_or_build; never reset, like any counter.
+        self.stats: Counter[str] = Counter()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="feed-refresh"
+        )
+
+    def get(self, key: Hashable, etag: str) -> FeedSnapshot | None:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None or snapshot.etag != etag:
+                return None
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    def set(self, key: Hashable, snapshot: FeedSnapshot) -> None:
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+
+    def get_or_build(
+        self,
+        key: Hashable,
+        etag: str,
+        build: Callable[[], FeedSnapshot],
+        allow_stale: bool = False,
+    ) -> FeedSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.etag == etag:
+                self._snapshots.move_to_end(key)
+                self.stats["hit"] += 1
+                return snapshot
+
+            future = self._builds.get((key, etag))
+            owner = future is None
+            if future is None:
+                future = self._builds[(key, etag)] = Future()
+
+            if snapshot is not None and allow_stale:
+                if owner:
+                    self._refresher.submit(self._run_build, key, etag, build, future)
+                self.stats["stale"] += 1
+                return snapshot
+            self.stats["miss" if owner else "coalesced"] += 1
+
+        if owner:
+            self._run_build(key, etag, build, future)
+        return future.result()
+
+    def _run_build(
+        self,
+        key: Hashable,
+        etag: str,
+        build: Callable[[], FeedSnapshot],
+        future: Future[FeedSnapshot],
+    ) -> None:
+        try:
+            snapshot = build()
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            self.set(key, snapshot)
+            future.set_result(snapshot)
+        finally:
+            with self._lock:
+                self._builds.pop((key, etag), None)
+
+    def wait_for_builds(self) -> None:
+        with self._lock:
+            builds = list(self._builds.values())
+        wait(builds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+class FragmentCache:
+    """LRU cache of rendered per-event fragments with a total size budget.
+
+    Each key holds a single version; storing a newer one replaces it.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._fragments: OrderedDict[Hashable, tuple[Hashable, bytes]] = OrderedDict()
+        self.stats: Counter[str] = Counter()
+
+    def get(self, key: Hashable, version: Hashable) -> bytes | None:
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is None or entry[0] != version:
+                self.stats["miss"] += 1
+                return None
+            self._fragments.move_to_end(key)
+            self.stats["hit"] += 1
+            return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, fragment: bytes) -> None:
+        if len(fragment) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._fragments.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self._fragments[key] = (version, fragment)
+            self.size += len(fragment)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._fragments.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+            self.size = 0
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    request_headers: Mapping[str, str], etag: str, last_modified: datetime | None
+) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = (
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        )
+        return etag in candidates
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+feed_cache = FeedCache(max_entries=settings.feed_cache_max_entries)
+fragment_cache = FragmentCache(max_bytes=settings.fragment_cache_max_bytes)
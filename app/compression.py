@@ -0,0 +1,76 @@
+import gzip
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:
+    brotli = None
+
+# Quality 5 keeps brotli close to gzip -6 in speed while compressing better;
+# the top levels cost seconds on a large feed.
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+# Below this size compression saves less than it costs.
+MIN_COMPRESS_BYTES = 1024
+
+# In order of preference when the client accepts several equally.
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # A fixed mtime keeps the output, and so the ETag, deterministic.
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    return {encoding: compress(body, encoding) for encoding in ENCODINGS}
+
+
+def negotiate_encoding(
+    accept_encoding: str | None, available: tuple[str, ...] = ENCODINGS
+) -> str | None:
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    best = None
+    best_weight = 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def variant_etag(etag: str, encoding: str | None) -> str:
+    # Each representation needs its own strong validator.
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def encode_response_body(
+    body: bytes, accept_encoding: str | None
+) -> tuple[bytes, dict[str, str]]:
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, headers
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return body, headers
+    return compress(body, encoding), {**headers, "Content-Encoding": encoding}
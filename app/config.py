@@ -1,4 +1,8 @@
-from pydantic import Field
+from pathlib import Path
+from typing import Literal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +17,40 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="sqlite:///./events.db", description="Database connection URL"
     )
+    read_database_url: str | None = Field(
+        default=None,
+        description="Connection URL for read-only routes (defaults to DATABASE_URL)",
+    )
+
+    sqlite_journal_mode: Literal[
+        "delete", "truncate", "persist", "memory", "wal", "off"
+    ] = Field(default="wal", description="SQLite journal_mode pragma")
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = Field(
+        default="normal", description="SQLite synchronous pragma"
+    )
+    sqlite_mmap_size: int = Field(
+        default=256 * 1024 * 1024, ge=0, description="SQLite mmap_size pragma (bytes)"
+    )
+    sqlite_cache_size: int = Field(
+        default=-64 * 1024,
+        description="SQLite cache_size pragma (pages, or KiB when negative)",
+    )
+    sqlite_temp_store: Literal["default", "file", "memory"] = Field(
+        default="memory", description="SQLite temp_store pragma"
+    )
+    sqlite_busy_timeout: int = Field(
+        default=5000, ge=0, description="SQLite busy_timeout pragma (milliseconds)"
+    )
+
+    slow_query_threshold_ms: float = Field(
+        default=250,
+        ge=0,
+        description="Log SQL statements slower than this, with their plan (0 disables)",
+    )
+    profile_dir: Path | None = Field(
+        default=None,
+        description="Directory where profiles of X-Profile requests are saved",
+    )
 
     auth_username: str = Field(
         default="admin", description="Username for basic authentication"
@@ -32,6 +70,53 @@ class Settings(BaseSettings):
         default="-//Community Events Calendar//EN",
         description="Calendar product identifier for ICS generation",
     )
+    feed_cache_max_entries: int = Field(
+        default=64, gt=0, description="Rendered feed variants kept in memory"
+    )
+    feed_stale_while_revalidate: bool = Field(
+        default=True,
+        description="Serve the previous feed while a changed one is rebuilt",
+    )
+    fragment_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Memory budget for rendered VEVENT fragments (bytes)",
+    )
+    publish_dir: Path | None = Field(
+        default=None,
+        description="Directory the feed is written to after each change, if set",
+    )
+    publish_debounce_seconds: float = Field(
+        default=1.0,
+        ge=0,
+        description="Delay that coalesces bursts of changes into one publish",
+    )
+    cleanup_batch_size: int = Field(
+        default=1000, gt=0, description="Past events deleted per cleanup transaction"
+    )
+    import_batch_size: int = Field(
+        default=1000, gt=0, description="Events validated and inserted per import batch"
+    )
+    import_timezone: str = Field(
+        default="UTC",
+        description="Zone that imported UTC and TZID event times are converted to",
+    )
+    ics_streaming: bool = Field(
+        default=False,
+        description="Stream the ICS feed from the database instead of caching it",
+    )
+    ics_stream_batch_size: int = Field(
+        default=500, gt=0, description="Events fetched per batch when rendering ICS"
+    )
+
+    @field_validator("import_timezone")
+    @classmethod
+    def check_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError) as exc:
+            raise ValueError(f"Unknown time zone: {value}") from exc
+        return value
 
 
 settings = Settings()  # type: ignore[call-arg]
@@ -0,0 +1,249 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Protocol
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+CRLF = "\r\n"
+CALENDAR_FOOTER = b"END:VCALENDAR\r\n"
+
+# RFC 5545 folds content lines longer than 75 octets. icalendar counts the
+# continuation space against that limit, leaving 74 octets of payload per line.
+_FOLD_WIDTH = 74
+
+
+class EventData(Protocol):
+    title: str
+    start_time: datetime
+    end_time: datetime
+    description: str
+    venue: str
+    url: str | None
+    tags: str | None
+    uid: str
+    created: datetime
+    last_modified: datetime
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    if line.isascii():
+        if len(line) <= _FOLD_WIDTH:
+            return line
+        return "\r\n ".join(
+            line[i : i + _FOLD_WIDTH] for i in range(0, len(line), _FOLD_WIDTH)
+        )
+
+    chunks = []
+    start = 0
+    width = 0
+    for index, char in enumerate(line):
+        code = ord(char)
+        size = 1 if code < 0x80 else 2 if code < 0x800 else 3 if code < 0x10000 else 4
+        width += size
+        if width > _FOLD_WIDTH:
+            chunks.append(line[start:index])
+            start = index
+            width = size
+    chunks.append(line[start:])
+    return "\r\n ".join(chunks)
+
+
+def format_datetime(value: datetime) -> str:
+    if value.tzinfo is None:
+        return (
+            f"{value.year:04d}{value.month:02d}{value.day:02d}"
+            f"T{value.hour:02d}{value.minute:02d}{value.second:02d}"
+        )
+    return format_datetime(value.astimezone(timezone.utc).replace(tzinfo=None)) + "Z"
+
+
+def format_timestamp(value: datetime) -> str:
+    # Bookkeeping timestamps are stored as naive UTC.
+    if value.tzinfo is None:
+        return format_datetime(value) + "Z"
+    return format_datetime(value)
+
+
+def calendar_header(prodid: str) -> bytes:
+    lines = (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        fold_line("PRODID:" + escape_text(prodid)),
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "",
+    )
+    return CRLF.join(lines).encode()
+
+
+def render_event(event: EventData) -> bytes:
+    last_modified = format_timestamp(event.last_modified)
+    tags = [tag.strip() for tag in (event.tags or "").split(",") if tag.strip()]
+    categories = (
+        [fold_line("CATEGORIES:" + ",".join(escape_text(tag) for tag in tags))]
+        if tags
+        else []
+    )
+    lines = (
+        "BEGIN:VEVENT",
+        fold_line("SUMMARY:" + escape_text(event.title)),
+        "DTSTART:" + format_datetime(event.start_time),
+        "DTEND:" + format_datetime(event.end_time),
+        "DTSTAMP:" + last_modified,
+        fold_line("UID:" + escape_text(event.uid)),
+        *categories,
+        "CREATED:" + format_timestamp(event.created),
+        fold_line("DESCRIPTION:" + escape_text(event.description)),
+        "LAST-MODIFIED:" + last_modified,
+        fold_line("LOCATION:" + escape_text(event.venue)),
+        fold_line("URL:" + (event.url or "")),
+        "END:VEVENT",
+        "",
+    )
+    return CRLF.join(lines).encode()
+
+
+ContentLine = tuple[str, dict[str, str], str]
+
+_TEXT_ESCAPE = re.compile(r"\\([\\;,nN])")
+_DURATION = re.compile(
+    r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?"
+)
+
+
+def unescape_text(value: str) -> str:
+    return _TEXT_ESCAPE.sub(lambda match: "\n" if match[1] in "nN" else match[1], value)
+
+
+def split_text_list(value: str) -> list[str]:
+    items = []
+    start = 0
+    escaped = False
+    for index, char in enumerate(value):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ",":
+            items.append(unescape_text(value[start:index]))
+            start = index + 1
+    items.append(unescape_text(value[start:]))
+    return items
+
+
+def parse_content_line(line: str) -> ContentLine:
+    quoted = False
+    separators = []
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == ";":
+            separators.append(index)
+        elif not quoted and char == ":":
+            break
+    else:
+        raise ValueError(f"Missing ':' in content line {line[:40]!r}")
+
+    name, *raw_params = (
+        line[start + 1 : end]
+        for start, end in zip([-1, *separators], [*separators, index])
+    )
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, line[index + 1 :]
+
+
+def parse_datetime(value: str, params: dict[str, str]) -> datetime:
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        parsed_date = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        return datetime(parsed_date.year, parsed_date.month, parsed_date.day)
+
+    parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return parsed.replace(tzinfo=timezone.utc)
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            return parsed.replace(tzinfo=ZoneInfo(tzid))
+        except (ZoneInfoNotFoundError, ValueError):
+            # Exports from other tools often use non-IANA zone names; keep
+            # the wall-clock time rather than rejecting the event.
+            return parsed
+    return parsed
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.fullmatch(value)
+    if match is None or not any(match.groups()[1:]):
+        raise ValueError(f"Invalid DURATION {value!r}")
+    weeks, days, hours, minutes, seconds = (
+        int(part or 0) for part in match.groups()[1:]
+    )
+    duration = timedelta(
+        weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds
+    )
+    return -duration if match[1] == "-" else duration
+
+
+class VEventReader:
+    """Collects VEVENT properties from an iCalendar stream one line at a time.
+
+    ``feed`` returns the properties of each VEVENT as its END line arrives, so
+    memory use is bounded by the largest event rather than the whole file.
+    Components nested in a VEVENT, such as VALARM, are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.line_number = 0
+        self._pending: str | None = None
+        self._properties: list[ContentLine] | None = None
+        self._nested = 0
+
+    def feed(self, raw_line: str) -> list[ContentLine] | None:
+        self.line_number += 1
+        raw_line = raw_line.rstrip("\r\n")
+        if raw_line[:1] in (" ", "\t") and self._pending is not None:
+            self._pending += raw_line[1:]
+            return None
+        line, self._pending = self._pending, raw_line
+        return self._process(line)
+
+    def close(self) -> list[ContentLine] | None:
+        line, self._pending = self._pending, None
+        return self._process(line)
+
+    def _process(self, line: str | None) -> list[ContentLine] | None:
+        if not line:
+            return None
+        if self._properties is None:
+            if line.upper() == "BEGIN:VEVENT":
+                self._properties = []
+            return None
+
+        try:
+            name, params, value = parse_content_line(line)
+        except ValueError as exc:
+            raise ValueError(f"Line {self.line_number - 1}: {exc}") from exc
+
+        if name == "BEGIN":
+            self._nested += 1
+        elif name == "END" and self._nested:
+            self._nested -= 1
+        elif name == "END":
+            properties, self._properties = self._properties, None
+            return properties
+        elif not self._nested:
+            self._properties.append((name, params, value))
+        return None
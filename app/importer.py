@@ -0,0 +1,331 @@
+import html
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import ReturningInsert
+
+from .ics import (
+    ContentLine,
+    VEventReader,
+    parse_datetime,
+    parse_duration,
+    split_text_list,
+    unescape_text,
+)
+from .models import (
+    Event,
+    bump_calendar_version,
+    new_uid,
+    sync_event_tags,
+    utcnow,
+)
+from .schemas import EventCreate
+
+NDJSON_MEDIA_TYPES = frozenset({"application/x-ndjson", "application/jsonl"})
+ICS_MEDIA_TYPE = "text/calendar"
+# Dialects with INSERT ... ON CONFLICT DO UPDATE, which ICS import relies on.
+SUPPORTED_UPSERT_DIALECTS = frozenset({"sqlite", "postgresql"})
+
+# Columns an ICS re-import may change; rows where none differ are left alone.
+_SYNCED_COLUMNS = (
+    "title",
+    "start_time",
+    "end_time",
+    "description",
+    "venue",
+    "url",
+    "tags",
+)
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    unchanged: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+
+def event_values(event: EventCreate, now: datetime) -> dict[str, Any]:
+    return {
+        "title": event.title,
+        "start_time": event.start_time,
+        "end_time": event.end_time,
+        "description": event.description,
+        "venue": event.venue,
+        "url": event.url,
+        "tags": ",".join(event.tags),
+        "uid": new_uid(),
+        "created": now,
+        "last_modified": now,
+    }
+
+
+class EventImporter:
+    """Validates payloads a batch at a time and bulk inserts the valid ones.
+
+    Every batch goes into the same transaction; nothing is visible until
+    ``commit`` runs, and closing the session without it discards the import.
+    """
+
+    def __init__(self, db: Session, batch_size: int) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self.result = ImportResult()
+        self._pending: list[tuple[int, object]] = []
+        self._now = utcnow()
+
+    @property
+    def batch_full(self) -> bool:
+        return len(self._pending) >= self.batch_size
+
+    def add(self, index: int, payload: object) -> None:
+        self._pending.append((index, payload))
+
+    def add_line(self, index: int, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            self.reject(
+                index, [{"type": "json_invalid", "loc": [], "msg": "Invalid JSON"}]
+            )
+        else:
+            self.add(index, payload)
+
+    def reject(self, index: int, errors: list[Any]) -> None:
+        self.result.errors.append({"index": index, "errors": errors})
+
+    def flush(self) -> None:
+        rows = []
+        for index, payload in self._pending:
+            try:
+                event = EventCreate.model_validate(payload)
+            except ValidationError as exc:
+                self.reject(
+                    index,
+                    exc.errors(
+                        include_url=False, include_context=False, include_input=False
+                    ),
+                )
+            else:
+                rows.append(event_values(event, self._now))
+        self._pending = []
+
+        if rows:
+            conn = self.db.connection()
+            inserted = conn.execute(insert(Event).returning(Event.id, Event.tags), rows)
+            sync_event_tags(conn, inserted.tuples().all())
+            self.result.imported += len(rows)
+
+    def commit(self) -> ImportResult:
+        self.flush()
+        if self.result.imported:
+            bump_calendar_version(self.db)
+        self.db.commit()
+        return self.result
+
+
+def import_json_array(importer: EventImporter, body: bytes) -> ImportResult:
+    payloads = json.loads(body)
+    if not isinstance(payloads, list):
+        raise ValueError("Expected a JSON array of events")
+
+    for index, payload in enumerate(payloads):
+        importer.add(index, payload)
+        if importer.batch_full:
+            importer.flush()
+    return importer.commit()
+
+
+def naive_in(value: datetime, zone: tzinfo) -> datetime:
+    # Times are stored naive: event times as wall-clock time in the
+    # import zone, bookkeeping timestamps in UTC. Floating values stay as given.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(zone).replace(tzinfo=None)
+
+
+def ics_event_values(
+    properties: list[ContentLine], now: datetime, zone: tzinfo = timezone.utc
+) -> dict[str, Any]:
+    values: dict[str, tuple[dict[str, str], str]] = {}
+    categories: list[str] = []
+    for name, params, value in properties:
+        if name == "CATEGORIES":
+            categories.extend(split_text_list(value))
+        else:
+            values.setdefault(name, (params, value))
+
+    missing = [name for name in ("UID", "SUMMARY", "DTSTART") if name not in values]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+
+    def text(name: str) -> str:
+        if name not in values:
+            return ""
+        # Our own feed carries HTML-escaped text; EventCreate escapes it again,
+        # so unescaping first keeps a re-import from escaping it twice.
+        return html.unescape(unescape_text(values[name][1]).strip())
+
+    def timestamp(name: str) -> datetime:
+        if name not in values:
+            return naive_in(now, timezone.utc)
+        params, value = values[name]
+        return naive_in(parse_datetime(value, params), timezone.utc)
+
+    def event_time(name: str) -> datetime:
+        params, value = values[name]
+        return naive_in(parse_datetime(value, params), zone)
+
+    uid = unescape_text(values["UID"][1]).strip()
+    if not uid:
+        raise ValueError("UID is empty")
+    if not text("SUMMARY"):
+        raise ValueError("SUMMARY is empty")
+
+    start_time = event_time("DTSTART")
+    if "DTEND" in values:
+        end_time = event_time("DTEND")
+    elif "DURATION" in values:
+        end_time = start_time + parse_duration(values["DURATION"][1])
+    elif len(values["DTSTART"][1]) == 8:
+        end_time = start_time + timedelta(days=1)
+    else:
+        end_time = start_time
+    if end_time < start_time:
+        raise ValueError("Event ends before it starts")
+
+    # The same limits as every other write path; failures raise ValidationError.
+    event = EventCreate.model_validate(
+        {
+            "title": text("SUMMARY"),
+            "start_time": start_time,
+            "end_time": end_time,
+            "description": text("DESCRIPTION"),
+            "venue": text("LOCATION"),
+            "url": text("URL"),
+            "tags": [html.unescape(tag) for tag in categories],
+        }
+    )
+    return {
+        **event_values(event, now),
+        "uid": uid,
+        "created": timestamp("CREATED"),
+        "last_modified": timestamp("LAST-MODIFIED"),
+    }
+
+
+def upsert_events_statement(
+    dialect_name: str,
+) -> ReturningInsert[tuple[int, str]]:
+    statement: sqlite.Insert | postgresql.Insert
+    if dialect_name == "sqlite":
+        statement = sqlite.insert(Event)
+    elif dialect_name == "postgresql":
+        statement = postgresql.insert(Event)
+    else:
+        raise NotImplementedError(f"ICS import does not support {dialect_name}")
+
+    excluded = statement.excluded
+    table = Event.__table__.c  # type: ignore[attr-defined]
+    return statement.on_conflict_do_update(
+        index_elements=[Event.uid],
+        set_={
+            **{name: excluded[name] for name in _SYNCED_COLUMNS},
+            "last_modified": excluded.last_modified,
+            "version": table.version + 1,
+        },
+        where=or_(
+            *(table[name].is_distinct_from(excluded[name]) for name in _SYNCED_COLUMNS)
+        ),
+    ).returning(Event.id, Event.tags)
+
+
+class IcsImporter:
+    """Upserts VEVENTs by UID, committing each batch as it fills.
+
+    Re-importing a feed only touches events whose content changed, and the
+    feed version is bumped only for batches that changed something.
+    """
+
+    def __init__(
+        self, db: Session, batch_size: int, zone: tzinfo = timezone.utc
+    ) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self.zone = zone
+        self.result = ImportResult()
+        self._reader = VEventReader()
+        self._statement = upsert_events_statement(db.get_bind().dialect.name)
+        self._pending: list[dict[str, Any]] = []
+        self._index = 0
+        self._now = utcnow()
+
+    @property
+    def batch_full(self) -> bool:
+        return len(self._pending) >= self.batch_size
+
+    def add_line(self, line: str) -> None:
+        self._add(self._reader.feed(line))
+
+    def _add(self, properties: list[ContentLine] | None) -> None:
+        if properties is None:
+            return
+        try:
+            self._pending.append(ics_event_values(properties, self._now, self.zone))
+        except ValidationError as exc:
+            self._reject(
+                exc.errors(
+                    include_url=False, include_context=False, include_input=False
+                )
+            )
+        except ValueError as exc:
+            self._reject([{"type": "value_error", "loc": [], "msg": str(exc)}])
+        self._index += 1
+
+    def _reject(self, errors: list[Any]) -> None:
+        self.result.errors.append({"index": self._index, "errors": errors})
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        # A UID repeated within one batch keeps its last occurrence, as it
+        # would across batches.
+        rows = list({row["uid"]: row for row in self._pending}.values())
+        self._pending = []
+        conn = self.db.connection()
+        # Upserts skipped by the WHERE clause return no row.
+        upserted = conn.execute(self._statement, rows).tuples().all()
+        sync_event_tags(conn, upserted)
+        changed = len(upserted)
+        if changed:
+            bump_calendar_version(self.db)
+        self.db.commit()
+        self.result.imported += changed
+        self.result.unchanged += len(rows) - changed
+
+    def commit(self) -> ImportResult:
+        self._add(self._reader.close())
+        self.flush()
+        return self.result
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    index = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield index, line
+            index += 1
+    if buffer:
+        yield index, buffer
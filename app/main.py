@@ -1,14 +1,60 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import partial
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
 from .config import settings
-from .models import create_tables
-from .routers import calendar
+from .metrics import MetricsMiddleware, instrument_engine, register_pool_gauges
+from .models import create_tables, engine, read_engine
+from .profiling import ProfilingMiddleware
+from .publisher import FeedPublisher
+from .querylog import QueryTimingMiddleware
+from .queries import EventFilters
+from .routers import calendar, metrics
 
 create_tables()
 
+engines = {"primary": engine}
+if read_engine is not engine:
+    engines["read"] = read_engine
+for name, instrumented in engines.items():
+    instrument_engine(instrumented, name)
+register_pool_gauges(engines)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if settings.publish_dir is None:
+        yield
+        return
+
+    # Built from the write engine so a publish never lags behind the commit
+    # that triggered it.
+    publisher = FeedPublisher(
+        settings.publish_dir,
+        partial(calendar._build_snapshot, engine, EventFilters()),
+        settings.publish_debounce_seconds,
+    )
+    await run_in_threadpool(publisher.publish)
+    publisher.install()
+    try:
+        yield
+    finally:
+        publisher.uninstall()
+        await run_in_threadpool(publisher.flush)
+
+
 app = FastAPI(
     title=settings.app_title,
     description=settings.app_description,
+    lifespan=lifespan,
 )
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(QueryTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(calendar.router)
+app.include_router(metrics.router)
@@ -1,17 +1,61 @@
-from typing import Generator
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Generator, Iterable, Mapping
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    bindparam,
+    create_engine,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    make_url,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config import settings
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def new_uid() -> str:
+    return str(uuid.uuid4())
+
+
 class Base(DeclarativeBase):
     pass
 
 
+def split_tags(tags: str | None) -> list[str]:
+    if not tags:
+        return []
+    return [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_start_time_id", "start_time", "id"),
+        Index("ix_events_end_time", "end_time"),
+        Index("ix_events_venue_start_time", "venue", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -21,19 +65,178 @@ class Event(Base):
     venue = Column(String, nullable=False)
     url = Column(String, default="")
     tags = Column(String, default="")
+    uid = Column(String, nullable=False, unique=True, index=True, default=new_uid)
+    created = Column(DateTime, nullable=False, default=utcnow)
+    last_modified = Column(DateTime, nullable=False, default=utcnow)
+    # Bumped by every UPDATE; keys the rendered VEVENT in the fragment cache.
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        onupdate=literal_column("version", Integer) + 1,
+    )
 
     def get_tags_list(self) -> list[str]:
-        if not self.tags:
-            return []
-        return [tag.strip() for tag in self.tags.split(",") if tag.strip()]
+        return split_tags(self.tags)  # type: ignore[arg-type]
 
     def set_tags_list(self, tags: list[str]) -> None:
         self.tags = ",".join(tags)  # type: ignore[assignment]
 
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+
+# Event.tags stays the display value; this table is the indexed copy used for
+# tag filters and facet counts. sync_event_tags keeps the two in step.
+event_tags = Table(
+    "event_tags",
+    Base.metadata,
+    Column(
+        "event_id",
+        Integer,
+        ForeignKey("events.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Index("ix_event_tags_tag_id_event_id", "tag_id", "event_id"),
+)
+
+
+def sync_event_tags(conn: Connection, rows: Iterable[tuple[int, str | None]]) -> None:
+    event_tag_names = {event_id: set(split_tags(tags)) for event_id, tags in rows}
+    if not event_tag_names:
+        return
+
+    conn.execute(
+        delete(event_tags).where(event_tags.c.event_id.in_(list(event_tag_names)))
+    )
+    names = set().union(*event_tag_names.values())
+    if not names:
+        return
+
+    tag_ids = dict(
+        conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).tuples().all()
+    )
+    missing = names - tag_ids.keys()
+    if missing:
+        conn.execute(insert(Tag), [{"name": name} for name in sorted(missing)])
+        tag_ids.update(
+            conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))
+            .tuples()
+            .all()
+        )
+
+    conn.execute(
+        insert(event_tags),
+        [
+            {"event_id": event_id, "tag_id": tag_ids[name]}
+            for event_id, tag_names in event_tag_names.items()
+            for name in tag_names
+        ],
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_flushed_event_tags(session: Session, flush_context: Any) -> None:
+    rows = [
+        (instance.id, instance.tags)
+        for instance in (*session.new, *session.dirty)
+        if isinstance(instance, Event)
+        and (
+            instance in session.new
+            or inspect(instance).attrs.tags.history.has_changes()
+        )
+    ]
+    if rows:
+        sync_event_tags(session.connection(), rows)  # type: ignore[arg-type]
+
+
+CALENDAR_STATE_ID = 1
+# Session.info key set once a transaction bumps the calendar version.
+CALENDAR_CHANGED = "calendar_changed"
+
+
+class CalendarState(Base):
+    __tablename__ = "calendar_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+        "busy_timeout": settings.sqlite_busy_timeout,
+        # Removing an event cascades to its event_tags rows.
+        "foreign_keys": 1,
+    }
+
+
+def make_engine(url: str, pragmas: Mapping[str, str | int] | None = None) -> Engine:
+    if make_url(url).get_backend_name() != "sqlite":
+        # Other drivers reject SQLite's connect args, so pass none.
+        return create_engine(url)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    profile = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in profile.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def is_memory_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def make_read_engine(
+    url: str, pragmas: Mapping[str, str | int] | None = None
+) -> Engine:
+    if make_url(url).get_backend_name() != "sqlite":
+        return make_engine(url)
+
+    # query_only goes last so the rest of the profile is still applied.
+    profile = {**(sqlite_pragmas() if pragmas is None else pragmas), "query_only": 1}
+    return make_engine(url, profile)
+
+
+engine = make_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Every connection to an in-memory SQLite database is a separate database, so
+# reads have to share the write engine there.
+_read_database_url = settings.read_database_url or settings.database_url
+read_engine = (
+    engine
+    if is_memory_database(_read_database_url)
+    else make_read_engine(_read_database_url)
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -43,5 +246,138 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def create_tables() -> None:
-    Base.metadata.create_all(bind=engine)
+def get_read_db() -> Generator[Session, None, None]:
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def bump_calendar_version(db: Session) -> None:
+    now = utcnow()
+    result = db.execute(
+        update(CalendarState)
+        .where(CalendarState.id == CALENDAR_STATE_ID)
+        .values(version=CalendarState.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:  # type: ignore[attr-defined]
+        db.add(CalendarState(id=CALENDAR_STATE_ID, version=1, updated_at=now))
+    db.info[CALENDAR_CHANGED] = True
+
+
+def get_calendar_state(db: Session) -> tuple[int, datetime | None]:
+    row = db.execute(
+        select(CalendarState.version, CalendarState.updated_at).where(
+            CalendarState.id == CALENDAR_STATE_ID
+        )
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at.replace(tzinfo=timezone.utc)
+
+
+def _add_missing_columns(bind: Engine) -> None:
+    table = Base.metadata.tables["events"]
+    existing = {column["name"] for column in inspect(bind).get_columns("events")}
+    missing = [column for column in table.columns if column.name not in existing]
+    if not missing:
+        return
+
+    with bind.begin() as conn:
+        for column in missing:
+            column_type = column.type.compile(dialect=bind.dialect)
+            conn.execute(
+                text(f"ALTER TABLE events ADD COLUMN {column.name} {column_type}")
+            )
+
+        now = utcnow()
+        conn.execute(
+            update(table)
+            .where(table.c.created.is_(None))
+            .values(created=now, last_modified=now)
+        )
+        missing_uids = conn.scalars(
+            select(table.c.id).where(table.c.uid.is_(None))
+        ).all()
+        if missing_uids:
+            conn.execute(
+                update(table).where(table.c.id == bindparam("event_id")),
+                [{"event_id": event_id, "uid": new_uid()} for event_id in missing_uids],
+            )
+        conn.execute(update(table).where(table.c.version.is_(None)).values(version=1))
+
+
+def _migrate_events(bind: Engine) -> None:
+    _add_missing_columns(bind)
+    for index in Base.metadata.tables["events"].indexes:
+        index.create(bind, checkfirst=True)
+
+
+SEARCH_INDEX_DDL = (
+    """
+    CREATE VIRTUAL TABLE events_fts USING fts5(
+        title, description, venue,
+        content='events', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title, description, venue)
+        VALUES (new.id, new.title, new.description, new.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, venue)
+        VALUES ('delete', old.id, old.title, old.description, old.venue);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_update
+    AFTER UPDATE OF title, description, venue ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title, description, venue)
+        VALUES ('delete', old.id, old.title, old.description, old.venue);
+        INSERT INTO events_fts(rowid, title, description, venue)
+        VALUES (new.id, new.title, new.description, new.venue);
+    END
+    """,
+)
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+
+
+def _create_search_index(bind: Engine) -> None:
+    if bind.dialect.name != "sqlite" or inspect(bind).has_table("events_fts"):
+        return
+
+    with bind.begin() as conn:
+        for statement in SEARCH_INDEX_DDL:
+            conn.execute(text(statement))
+        # The triggers only see future writes; index the rows already there.
+        rebuild_search_index(conn)
+
+
+def _backfill_event_tags(bind: Engine) -> None:
+    with bind.begin() as conn:
+        rows = conn.execute(
+            select(Event.id, Event.tags).where(func.coalesce(Event.tags, "") != "")
+        )
+        for partition in rows.tuples().partitions(1000):
+            sync_event_tags(conn, partition)
+
+
+def create_tables(bind: Engine = engine) -> None:
+    backfill_tags = not inspect(bind).has_table("event_tags")
+    Base.metadata.create_all(bind=bind)
+    _migrate_events(bind)
+    if backfill_tags:
+        _backfill_event_tags(bind)
+    _create_search_index(bind)
+    with Session(bind) as db:
+        if db.get(CalendarState, CALENDAR_STATE_ID) is None:
+            db.add(CalendarState(id=CALENDAR_STATE_ID, version=0, updated_at=utcnow()))
+            db.commit()
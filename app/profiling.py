@@ -0,0 +1,120 @@
+"""On-demand profiling of single requests for authenticated admins.
+
+A request carrying ``X-Profile: 1`` (or ``?profile=1``) and valid admin
+credentials runs under cProfile, and the response body is replaced by the
+report. Requests without the flag only pay for a header scan.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.security import HTTPBasic
+
+from .auth import authenticate_user
+from .config import settings
+
+REPORT_LIMIT = 40
+_optional_security = HTTPBasic(auto_error=False)
+# cProfile hooks the whole interpreter from Python 3.12 on, so only one
+# profile can run at a time.
+_profile_lock = threading.Lock()
+
+
+def profile_requested(scope: Any) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value not in (b"", b"0")
+    if b"profile=" not in scope["query_string"]:
+        return False
+    values = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [])
+    return any(value not in ("", "0") for value in values)
+
+
+def profile_report(
+    profiler: cProfile.Profile, title: str, status: int, elapsed: float
+) -> str:
+    output = io.StringIO()
+    output.write(f"{title} -> {status} in {elapsed * 1000:.1f} ms\n\n")
+    stats = pstats.Stats(profiler, stream=output).strip_dirs()
+    output.write("By cumulative time (call tree):\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+    output.write("By own time (top functions):\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(REPORT_LIMIT // 2)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """Profiles flagged requests and answers with the profile instead.
+
+    The original status is kept in ``X-Profile-Status``. With ``PROFILE_DIR``
+    set the raw stats are also saved there for tools like snakeviz. Work for
+    other requests running at the same time shows up in the profile too.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        credentials = await _optional_security(Request(scope))
+        try:
+            if credentials is None:
+                raise HTTPException(status_code=401, detail="Not authenticated")
+            authenticate_user(credentials)
+        except HTTPException as exc:
+            response = JSONResponse(
+                {"detail": exc.detail},
+                status_code=exc.status_code,
+                headers={"WWW-Authenticate": "Basic"},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            response = JSONResponse(
+                {"detail": "Another request is being profiled"}, status_code=409
+            )
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message: Any) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = cProfile.Profile()
+        try:
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+        finally:
+            _profile_lock.release()
+
+        headers = {"X-Profile-Status": str(status)}
+        if settings.profile_dir is not None:
+            settings.profile_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            path = settings.profile_dir / f"{stamp}.prof"
+            profiler.dump_stats(path)
+            headers["X-Profile-File"] = path.name
+
+        title = f"{scope['method']} {scope['path']}"
+        report = profile_report(profiler, title, status, elapsed)
+        await PlainTextResponse(report, headers=headers)(scope, receive, send)
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .cache import FeedSnapshot
+from .models import CALENDAR_CHANGED
+
+FEED_FILENAME = "events.ics"
+# Suffixes a proxy looks for next to the feed, e.g. nginx gzip_static/brotli_static.
+VARIANT_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def write_atomic(path: Path, data: bytes, mtime: float | None = None) -> None:
+    # Readers see either the old file or the new one, never a partial write.
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as temp:
+            temp.write(data)
+            temp.flush()
+            os.fsync(temp.fileno())
+        os.chmod(temp_name, 0o644)
+        if mtime is not None:
+            os.utime(temp_name, (mtime, mtime))
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+class FeedPublisher:
+    """Writes the unfiltered feed to disk after committed mutations.
+
+    Changes within ``debounce`` seconds of the first one are coalesced into a
+    single publish, which renders whatever is committed when it runs.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        build: Callable[[], FeedSnapshot],
+        debounce: float,
+    ) -> None:
+        self.directory = directory
+        self.build = build
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def publish(self) -> FeedSnapshot:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        # Serialized so an older render can never overwrite a newer one.
+        with self._publish_lock:
+            snapshot = self.build()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            mtime = (
+                snapshot.last_modified.timestamp()
+                if snapshot.last_modified is not None
+                else None
+            )
+            path = self.directory / FEED_FILENAME
+            for encoding, body in snapshot.encoded.items():
+                suffix = VARIANT_SUFFIXES[encoding]
+                write_atomic(path.with_name(path.name + suffix), body, mtime)
+            write_atomic(path, snapshot.body, mtime)
+        return snapshot
+
+    def schedule(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.debounce, self.publish)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = self._timer is not None
+        if pending:
+            self.publish()
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(CALENDAR_CHANGED, False):
+            self.schedule()
+
+    def _after_rollback(self, session: Session, previous_transaction: Any) -> None:
+        session.info.pop(CALENDAR_CHANGED, None)
+
+    def install(self) -> None:
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_soft_rollback", self._after_rollback)
+
+    def uninstall(self) -> None:
+        event.remove(Session, "after_commit", self._after_commit)
+        event.remove(Session, "after_soft_rollback", self._after_rollback)
@@ -0,0 +1,172 @@
+import base64
+import binascii
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Delete,
+    Row,
+    Select,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column, table
+
+from .models import Event, Tag, bump_calendar_version, event_tags
+
+
+@dataclass(frozen=True)
+class EventFilters:
+    tag: str | None = None
+    venue: str | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+
+    def clauses(self) -> list[ColumnElement[bool]]:
+        clauses: list[ColumnElement[bool]] = []
+        if self.tag:
+            tagged = (
+                select(event_tags.c.event_id)
+                .join(Tag, Tag.id == event_tags.c.tag_id)
+                .where(Tag.name == self.tag)
+            )
+            clauses.append(Event.id.in_(tagged))
+        if self.venue:
+            clauses.append(Event.venue == self.venue)
+        if self.start is not None:
+            clauses.append(Event.end_time >= self.start)
+        if self.end is not None:
+            clauses.append(Event.start_time < self.end)
+        return clauses
+
+
+# Read paths select these columns as plain rows rather than hydrating Event
+# instances, skipping identity-map and change-tracking work per row. The
+# rows still satisfy ics.EventData and carry id/uid/version for the
+# fragment cache.
+EVENT_COLUMNS = (
+    Event.id,
+    Event.title,
+    Event.start_time,
+    Event.end_time,
+    Event.description,
+    Event.venue,
+    Event.url,
+    Event.tags,
+    Event.uid,
+    Event.created,
+    Event.last_modified,
+    Event.version,
+)
+
+
+def feed_query(filters: EventFilters) -> Select[Any]:
+    return select(*EVENT_COLUMNS).where(*filters.clauses())
+
+
+def tag_facets_query(filters: EventFilters) -> Select[tuple[str, int]]:
+    count = func.count().label("count")
+    statement = select(Tag.name, count).join(event_tags, event_tags.c.tag_id == Tag.id)
+    clauses = filters.clauses()
+    if clauses:
+        statement = statement.join(Event, Event.id == event_tags.c.event_id).where(
+            *clauses
+        )
+    return statement.group_by(Tag.id).order_by(count.desc(), Tag.name)
+
+
+def expired_events_delete(now: datetime, batch_size: int) -> Delete:
+    expired_ids = select(Event.id).where(Event.end_time < now).limit(batch_size)
+    return delete(Event).where(Event.id.in_(expired_ids.scalar_subquery()))
+
+
+def delete_expired_events(db: Session, now: datetime, batch_size: int) -> int:
+    removed = 0
+    # Commit per batch so the SQLite write lock is released between chunks.
+    while True:
+        result = db.execute(expired_events_delete(now, batch_size))
+        deleted = result.rowcount  # type: ignore[attr-defined]
+        if deleted:
+            bump_calendar_version(db)
+        db.commit()
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+
+
+MIN_EVENT_ID = -(2**63)
+MAX_EVENT_ID = 2**63 - 1
+
+
+def encode_cursor(event: Row[Any]) -> str:
+    position = json.dumps([event.start_time.isoformat(), event.id])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(position, list) or len(position) != 2:
+            raise ValueError("Cursor is not a [start_time, id] pair")
+        start_time, event_id = datetime.fromisoformat(position[0]), int(position[1])
+        # Out-of-range ids would otherwise overflow when bound to the query.
+        if not MIN_EVENT_ID <= event_id <= MAX_EVENT_ID:
+            raise ValueError("Cursor id out of range")
+        return start_time, event_id
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def events_page_query(
+    filters: EventFilters, after: tuple[datetime, int] | None, limit: int
+) -> Select[Any]:
+    statement = select(*EVENT_COLUMNS).where(*filters.clauses())
+    if after is not None:
+        start_time, event_id = after
+        statement = statement.where(
+            tuple_(Event.start_time, Event.id)
+            > tuple_(literal(start_time, DateTime), literal(event_id))
+        )
+    return statement.order_by(Event.start_time, Event.id).limit(limit)
+
+
+events_fts = table("events_fts", column("rowid"))
+
+# bm25 weights for the title, description and venue columns of events_fts.
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+
+def search_expression(terms: str) -> str | None:
+    # Quoting every token keeps user input out of the FTS5 query syntax; the
+    # trailing * turns each one into a prefix match.
+    tokens = _SEARCH_TOKEN.findall(terms)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_query(
+    expression: str, filters: EventFilters, offset: int, limit: int
+) -> Select[tuple[Event]]:
+    fts: ColumnElement[str] = literal_column("events_fts")
+    return (
+        select(Event)
+        .join(events_fts, events_fts.c.rowid == Event.id)
+        .where(fts.op("MATCH")(expression), *filters.clauses())
+        .order_by(func.bm25(fts, *SEARCH_WEIGHTS), Event.id)
+        .offset(offset)
+        .limit(limit)
+    )
@@ -0,0 +1,116 @@
+"""Per-request SQL accounting and the slow-query log.
+
+The statement hooks installed by ``metrics.instrument_engine`` report every
+statement here. Requests get their query count and database time back as a
+``Server-Timing`` header, and statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are logged with their parameters and plan.
+"""
+
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.3f};desc="{self.count} queries"'
+
+
+# Set per request by QueryTimingMiddleware. Sync endpoints run in a copy of
+# the request's context, so they update the same QueryStats object.
+current_queries: ContextVar[QueryStats | None] = ContextVar(
+    "current_queries", default=None
+)
+
+
+def explain_query_plan(cursor: Any, statement: str, parameters: Any) -> list[str]:
+    # A fresh DBAPI cursor keeps the plan out of the engine's own hooks and
+    # leaves the original cursor's results untouched.
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in plan_cursor.fetchall()]
+    finally:
+        plan_cursor.close()
+
+
+def log_slow_query(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    elapsed: float,
+) -> None:
+    plan: list[str] = []
+    if conn.dialect.name == "sqlite" and not executemany:
+        try:
+            plan = explain_query_plan(cursor, statement, parameters)
+        except Exception:
+            # DDL, PRAGMA and the like have no plan to show.
+            plan = []
+    logger.warning(
+        "Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n%s",
+        elapsed * 1000,
+        statement,
+        parameters,
+        "\n".join(f"  {detail}" for detail in plan) or "  (not available)",
+    )
+
+
+def record_query(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    elapsed: float,
+) -> None:
+    stats = current_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+    threshold = settings.slow_query_threshold_ms
+    if threshold and elapsed * 1000 >= threshold:
+        log_slow_query(conn, cursor, statement, parameters, executemany, elapsed)
+
+
+class QueryTimingMiddleware:
+    """Adds each request's SQL count and time as a Server-Timing header.
+
+    The header goes out with the response start, so queries issued while a
+    streamed body is produced are not included.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_with_timing(message: Any) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = current_queries.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
@@ -1,87 +1,184 @@
 import html
-import secrets
+import json
+import time
 import uuid
+from dataclasses import asdict
 from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, Form, HTTPException, Response
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from icalendar import Calendar, Event as ICalEvent
-from pydantic import BaseModel, Field, field_validator
+from functools import partial
+from typing import Any, Iterator, Sequence
+from zoneinfo import ZoneInfo
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import (
+    HTMLResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Connection, Engine, Row
 from sqlalchemy.orm import Session
 
+from ..auth import authenticate_user
+from ..cache import (
+    FeedSnapshot,
+    feed_cache,
+    fragment_cache,
+    is_not_modified,
+    make_etag,
+    validator_headers,
+)
+from ..compression import (
+    compress_variants,
+    encode_response_body,
+    negotiate_encoding,
+    variant_etag,
+)
 from ..config import settings
-from ..models import Event, get_db
+from ..importer import (
+    ICS_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPES,
+    SUPPORTED_UPSERT_DIALECTS,
+    EventImporter,
+    IcsImporter,
+    import_json_array,
+    iter_lines,
+)
+from ..ics import CALENDAR_FOOTER, calendar_header, render_event
+from ..metrics import ics_body_bytes, ics_build_seconds
+from ..models import (
+    Event,
+    bump_calendar_version,
+    get_calendar_state,
+    get_db,
+    get_read_db,
+    rebuild_search_index,
+)
+from ..queries import (
+    EventFilters,
+    decode_cursor,
+    delete_expired_events,
+    encode_cursor,
+    events_page_query,
+    feed_query,
+    search_expression,
+    search_query,
+    tag_facets_query,
+)
+from ..schemas import EventCreate
 
 router = APIRouter(
     tags=["calendar"],
     responses={404: {"description": "Not found"}},
 )
 
-security = HTTPBasic()
+
+def _json_default(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _rows_json(rows: Sequence[Row[Any]]) -> bytes:
+    # Same output as jsonable_encoder + JSONResponse, without the generic
+    # per-value dispatch.
+    return json.dumps(
+        [row._asdict() for row in rows],
+        default=_json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
 
 
-def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)) -> str:
-    correct_username = secrets.compare_digest(
-        credentials.username, settings.auth_username
+@router.get("/events")
+def get_events(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    after: str | None = Query(None, description="Cursor from X-Next-Cursor"),
+    tag: str | None = Query(None, max_length=50),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
+    _: str = Depends(authenticate_user),
+) -> Response:
+    try:
+        position = decode_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    filters = EventFilters(
+        tag=html.escape(tag.strip()) if tag else None, start=start, end=end
+    )
+    events = db.execute(events_page_query(filters, position, limit + 1)).all()
+    headers = {}
+    if len(events) > limit:
+        events = events[:limit]
+        cursor = encode_cursor(events[-1])
+        next_url = request.url.include_query_params(after=cursor)
+        headers["X-Next-Cursor"] = cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    body = _rows_json(events)
+    body, encoding_headers = encode_response_body(
+        body, request.headers.get("accept-encoding")
     )
-    correct_password = secrets.compare_digest(
-        credentials.password, settings.auth_password
+    return Response(
+        body, media_type="application/json", headers={**headers, **encoding_headers}
     )
-    if not (correct_username and correct_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    return credentials.username
-
-
-class EventCreate(BaseModel):
-    title: str = Field(..., max_length=200, min_length=1)
-    start_time: datetime
-    end_time: datetime
-    description: str = Field(..., max_length=2000, min_length=1)
-    venue: str = Field(..., max_length=200, min_length=1)
-    url: str = Field("", max_length=500)
-    tags: list[str] = Field(default_factory=list, max_length=10)
-
-    @field_validator("tags")
-    @classmethod
-    def validate_tags(cls, v):
-        if len(v) > 10:
-            raise ValueError("Maximum 10 tags allowed")
-        validated_tags = []
-        for tag in v:
-            if len(tag) > 50:
-                raise ValueError("Tag length cannot exceed 50 characters")
-            sanitized_tag = html.escape(tag.strip())
-            if sanitized_tag:
-                validated_tags.append(sanitized_tag)
-        return validated_tags
-
-    @field_validator("title", "description", "venue")
-    @classmethod
-    def sanitize_text_fields(cls, v):
-        if not v or not v.strip():
-            raise ValueError("Field cannot be empty")
-        return html.escape(v.strip())
-
-    @field_validator("url")
-    @classmethod
-    def validate_url(cls, v):
-        if v:
-            return html.escape(v.strip())
-        return v
 
 
-@router.get("/events")
-async def get_events(
-    db: Session = Depends(get_db),
+@router.get("/tags")
+def get_tag_facets(
+    venue: str | None = Query(None, max_length=200),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
+) -> list[dict[str, str | int]]:
+    filters = EventFilters(
+        venue=html.escape(venue.strip()) if venue else None, start=start, end=end
+    )
+    rows = db.execute(tag_facets_query(filters)).tuples()
+    return [{"tag": name, "count": count} for name, count in rows]
+
+
+@router.get("/events/search")
+def search_events(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
     _: str = Depends(authenticate_user),
 ):
-    events = db.query(Event).all()
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5")
+
+    expression = search_expression(q)
+    if expression is None:
+        return []
+
+    filters = EventFilters(start=start, end=end)
+    events = db.scalars(search_query(expression, filters, offset, limit + 1)).all()
+    if len(events) > limit:
+        events = events[:limit]
+        next_url = request.url.include_query_params(offset=offset + limit)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
     return events
 
 
 @router.delete("/events/{event_id}")
-async def delete_event(
+def delete_event(
     event_id: int,
     db: Session = Depends(get_db),
     _: str = Depends(authenticate_user),
@@ -91,16 +188,18 @@ async def delete_event(
         raise HTTPException(status_code=404, detail="Event not found")
 
     db.delete(event)
+    bump_calendar_version(db)
     db.commit()
     return {"message": f"Event {event_id} deleted successfully"}
 
 
 @router.post("/add-event")
-async def add_event(
+def add_event(
     event: EventCreate,
     db: Session = Depends(get_db),
     _: str = Depends(authenticate_user),
 ) -> dict[str, str]:
+    now = datetime.now(timezone.utc)
     db_event = Event(
         title=event.title,
         start_time=event.start_time,
@@ -108,59 +207,194 @@ async def add_event(
         description=event.description,
         venue=event.venue,
         url=event.url,
+        uid=str(uuid.uuid4()),
+        created=now,
+        last_modified=now,
     )
     db_event.set_tags_list(event.tags)
 
     db.add(db_event)
+    bump_calendar_version(db)
     db.commit()
     db.refresh(db_event)
 
     return {"message": "Event added successfully", "event_id": str(db_event.id)}
 
 
+@router.post("/events/import")
+async def import_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    _: str = Depends(authenticate_user),
+) -> dict[str, Any]:
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if media_type == ICS_MEDIA_TYPE:
+        if db.get_bind().dialect.name not in SUPPORTED_UPSERT_DIALECTS:
+            raise HTTPException(
+                status_code=501, detail="ICS import requires SQLite or PostgreSQL"
+            )
+        ics_importer = IcsImporter(
+            db, settings.import_batch_size, ZoneInfo(settings.import_timezone)
+        )
+        try:
+            async for line_number, line in iter_lines(request.stream()):
+                ics_importer.add_line(line.decode("utf-8", errors="replace"))
+                if ics_importer.batch_full:
+                    await run_in_threadpool(ics_importer.flush)
+            result = await run_in_threadpool(ics_importer.commit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return asdict(result)
+
+    importer = EventImporter(db, settings.import_batch_size)
+    if media_type in NDJSON_MEDIA_TYPES:
+        async for index, line in iter_lines(request.stream()):
+            importer.add_line(index, line)
+            if importer.batch_full:
+                await run_in_threadpool(importer.flush)
+        result = await run_in_threadpool(importer.commit)
+    else:
+        body = await request.body()
+        try:
+            result = await run_in_threadpool(import_json_array, importer, body)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Expected a JSON array or NDJSON stream of events",
+            )
+
+    return asdict(result)
+
+
+def _render_fragment(event: Row[Any]) -> bytes:
+    # The uid guards against SQLite reusing the id of a deleted event.
+    revision = (event.uid, event.version)
+    fragment = fragment_cache.get(event.id, revision)
+    if fragment is None:
+        fragment = render_event(event)  # type: ignore[arg-type]
+        fragment_cache.set(event.id, revision, fragment)
+    return fragment
+
+
+def _iter_calendar(db: Session, filters: EventFilters) -> Iterator[bytes]:
+    yield calendar_header(settings.calendar_prodid)
+
+    events = db.execute(
+        feed_query(filters).execution_options(yield_per=settings.ics_stream_batch_size)
+    )
+    for partition in events.partitions():
+        yield b"".join(_render_fragment(event) for event in partition)
+
+    yield CALENDAR_FOOTER
+
+
+def _build_calendar(db: Session, filters: EventFilters) -> bytes:
+    return b"".join(_iter_calendar(db, filters))
+
+
+def _build_snapshot(bind: Engine | Connection, filters: EventFilters) -> FeedSnapshot:
+    # Reading the state and the events in one transaction keeps the ETag
+    # consistent with the body it describes.
+    started = time.perf_counter()
+    with Session(bind) as db:
+        version, updated_at = get_calendar_state(db)
+        body = _build_calendar(db, filters)
+    etag = make_etag(version, updated_at, filters)
+    snapshot = FeedSnapshot(etag, updated_at, body, compress_variants(body))
+    ics_build_seconds.observe(time.perf_counter() - started)
+    ics_body_bytes.observe(len(body))
+    return snapshot
+
+
+def _stream_calendar(
+    bind: Engine | Connection, filters: EventFilters
+) -> Iterator[bytes]:
+    # The request's session is closed once the endpoint returns, so the
+    # response body reads through a session of its own.
+    with Session(bind) as db:
+        yield from _iter_calendar(db, filters)
+
+
+def _feed_validators(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    return {"Vary": "Accept-Encoding", **validator_headers(etag, last_modified)}
+
+
 @router.get("/events.ics")
-async def get_calendar(db: Session = Depends(get_db)) -> Response:
-    cal = Calendar()
-    cal.add("prodid", settings.calendar_prodid)
-    cal.add("version", "2.0")
-    cal.add("calscale", "GREGORIAN")
-    cal.add("method", "PUBLISH")
-
-    events = db.query(Event).all()
-
-    for event in events:
-        ical_event = ICalEvent()
-        ical_event.add("uid", str(uuid.uuid4()))
-        ical_event.add("dtstart", event.start_time)
-        ical_event.add("dtend", event.end_time)
-        ical_event.add("summary", event.title)
-        ical_event.add("description", event.description)
-        ical_event.add("location", event.venue)
-        ical_event.add("url", event.url)
-        ical_event.add("dtstamp", datetime.now(timezone.utc))
-        ical_event.add("created", datetime.now(timezone.utc))
-
-        cal.add_component(ical_event)
+def get_calendar(
+    request: Request,
+    tag: str | None = Query(None, max_length=50),
+    venue: str | None = Query(None, max_length=200),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    filters = EventFilters(
+        tag=html.escape(tag.strip()) if tag else None,
+        venue=html.escape(venue.strip()) if venue else None,
+        start=start,
+        end=end,
+    )
+    version, updated_at = get_calendar_state(db)
+    feed_etag = make_etag(version, updated_at, filters)
+    encoding = (
+        None
+        if settings.ics_streaming
+        else negotiate_encoding(request.headers.get("accept-encoding"))
+    )
+    etag = variant_etag(feed_etag, encoding)
+    if is_not_modified(request.headers, etag, updated_at):
+        return Response(status_code=304, headers=_feed_validators(etag, updated_at))
+
+    headers = {"Content-Disposition": "attachment; filename=events.ics"}
+    if settings.ics_streaming:
+        return StreamingResponse(
+            _stream_calendar(db.get_bind(), filters),
+            media_type="text/calendar",
+            headers={**headers, **_feed_validators(etag, updated_at)},
+        )
 
+    snapshot = feed_cache.get_or_build(
+        filters,
+        feed_etag,
+        partial(_build_snapshot, db.get_bind(), filters),
+        allow_stale=settings.feed_stale_while_revalidate,
+    )
+    # A stale (or newer) snapshot carries its own validators.
+    etag = variant_etag(snapshot.etag, encoding)
+    validators = _feed_validators(etag, snapshot.last_modified)
+    if snapshot.etag != feed_etag and is_not_modified(
+        request.headers, etag, snapshot.last_modified
+    ):
+        return Response(status_code=304, headers=validators)
+
+    headers.update(validators)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
     return Response(
-        cal.to_ical(),
-        media_type="text/calendar",
-        headers={"Content-Disposition": "attachment; filename=events.ics"},
+        snapshot.representation(encoding), media_type="text/calendar", headers=headers
     )
 
 
 @router.post("/cleanup")
-async def cleanup_past_events(
+def cleanup_past_events(
     db: Session = Depends(get_db), _: str = Depends(authenticate_user)
 ) -> dict[str, str]:
     now = datetime.now(timezone.utc)
-    past_events = db.query(Event).filter(Event.end_time < now).all()
+    removed = delete_expired_events(db, now, settings.cleanup_batch_size)
+    return {"message": f"Removed {removed} past events"}
+
 
-    for event in past_events:
-        db.delete(event)
+@router.post("/search/rebuild")
+def rebuild_search(
+    db: Session = Depends(get_db), _: str = Depends(authenticate_user)
+) -> dict[str, str]:
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5")
 
+    rebuild_search_index(db.connection())
     db.commit()
-    return {"message": f"Removed {len(past_events)} past events"}
+    return {"message": "Search index rebuilt"}
 
 
 @router.get("/submit-event", response_class=HTMLResponse)
@@ -237,7 +471,7 @@ async def submit_event_form(
 
 
 @router.post("/submit-event")
-async def submit_event_form_post(
+def submit_event_form_post(
     title: str = Form(..., max_length=200),
     start_time: str = Form(...),
     end_time: str = Form(...),
@@ -267,6 +501,7 @@ async def submit_event_form_post(
                 return RedirectResponse(url="/submit-event?error=1", status_code=303)
             tags_list = [html.escape(tag)[:50] for tag in raw_tags[:10]]
 
+        now = datetime.now(timezone.utc)
         db_event = Event(
             title=sanitized_title,
             start_time=start_dt,
@@ -274,10 +509,14 @@ async def submit_event_form_post(
             description=sanitized_description,
             venue=sanitized_venue,
             url=sanitized_url,
+            uid=str(uuid.uuid4()),
+            created=now,
+            last_modified=now,
         )
         db_event.set_tags_list(tags_list)
 
         db.add(db_event)
+        bump_calendar_version(db)
         db.commit()
 
         return RedirectResponse(url="/submit-event?success=1", status_code=303)
@@ -0,0 +1,42 @@
+import html
+from datetime import datetime
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class EventCreate(BaseModel):
+    title: str = Field(..., max_length=200, min_length=1)
+    start_time: datetime
+    end_time: datetime
+    description: str = Field(..., max_length=2000, min_length=1)
+    venue: str = Field(..., max_length=200, min_length=1)
+    url: str = Field("", max_length=500)
+    tags: list[str] = Field(default_factory=list, max_length=10)
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v):
+        if len(v) > 10:
+            raise ValueError("Maximum 10 tags allowed")
+        validated_tags = []
+        for tag in v:
+            if len(tag) > 50:
+                raise ValueError("Tag length cannot exceed 50 characters")
+            sanitized_tag = html.escape(tag.strip())
+            if sanitized_tag:
+                validated_tags.append(sanitized_tag)
+        return validated_tags
+
+    @field_validator("title", "description", "venue")
+    @classmethod
+    def sanitize_text_fields(cls, v):
+        if not v or not v.strip():
+            raise ValueError("Field cannot be empty")
+        return html.escape(v.strip())
+
+    @field_validator("url")
+    @classmethod
+    def validate_url(cls, v):
+        if v:
+            return html.escape(v.strip())
+        return v
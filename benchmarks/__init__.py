@@ -0,0 +1,4 @@
+import os
+
+# Benchmarks import the app modules, whose settings require a password.
+os.environ.setdefault("AUTH_PASSWORD", "benchmark")
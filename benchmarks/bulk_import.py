@@ -0,0 +1,103 @@
+"""Compare one POST /add-event per event with a single NDJSON bulk import.
+
+The per-event path is timed on a sample and extrapolated to the full count.
+
+Run with ``python -m benchmarks.bulk_import --events 50000``.
+"""
+
+import argparse
+import base64
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import Event, create_tables, get_db, make_engine
+from app.routers import calendar
+
+BASE = datetime(2025, 7, 1, 18, 0, 0)
+
+
+def payload(index: int) -> dict[str, object]:
+    start = BASE + timedelta(hours=index % 8760)
+    return {
+        "title": f"Event {index}",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(),
+        "description": "Benchmark event " * 8,
+        "venue": f"Venue {index % 50}",
+        "url": f"https://example.com/events/{index}",
+        "tags": ["music", "community"],
+    }
+
+
+def make_client(path: Path) -> tuple[TestClient, sessionmaker]:
+    engine = make_engine(f"sqlite:///{path}")
+    create_tables(engine)
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(calendar.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app), session_local
+
+
+def count_events(session_local: sessionmaker) -> int:
+    with session_local() as db:
+        return db.scalar(select(func.count()).select_from(Event)) or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=1_000)
+    args = parser.parse_args()
+
+    credentials = f"{settings.auth_username}:{settings.auth_password}"
+    auth = {"Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
+
+    with tempfile.TemporaryDirectory() as directory:
+        client, session_local = make_client(Path(directory) / "single.db")
+        sample = min(args.sample, args.events)
+        started = time.perf_counter()
+        for index in range(sample):
+            client.post("/add-event", json=payload(index), headers=auth)
+        elapsed = time.perf_counter() - started
+        estimate = elapsed / sample * args.events
+        print(
+            f"add-event inserted={count_events(session_local):<8} "
+            f"time={elapsed:7.2f} s (est. {estimate:7.1f} s for {args.events})"
+        )
+
+        client, session_local = make_client(Path(directory) / "bulk.db")
+        body = b"\n".join(
+            json.dumps(payload(index)).encode() for index in range(args.events)
+        )
+        started = time.perf_counter()
+        response = client.post(
+            "/events/import",
+            content=body,
+            headers={**auth, "Content-Type": "application/x-ndjson"},
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f"import    inserted={response.json()['imported']:<8} time={elapsed:7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
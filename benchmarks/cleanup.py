@@ -0,0 +1,96 @@
+"""Compare the old load-then-delete cleanup with the batched bulk DELETE.
+
+Run with ``python -m benchmarks.cleanup --expired 100000``.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import Engine, create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models import Event, create_tables, new_uid
+from app.queries import delete_expired_events
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+
+def seed(engine: Engine, expired: int, upcoming: int) -> None:
+    rows = []
+    for index in range(expired + upcoming):
+        offset = timedelta(days=1 + index % 365)
+        start = NOW - offset if index < expired else NOW + offset
+        rows.append(
+            {
+                "title": f"Event {index}",
+                "start_time": start,
+                "end_time": start + timedelta(hours=2),
+                "description": "Benchmark event " * 8,
+                "venue": f"Venue {index % 50}",
+                "url": "",
+                "tags": "music,community",
+                "uid": new_uid(),
+                "created": NOW,
+                "last_modified": NOW,
+            }
+        )
+    with engine.begin() as conn:
+        conn.execute(insert(Event), rows)
+
+
+def legacy_cleanup(db: Session, batch_size: int) -> int:
+    past_events = db.query(Event).filter(Event.end_time < NOW).all()
+    for event in past_events:
+        db.delete(event)
+    db.commit()
+    return len(past_events)
+
+
+def batched_cleanup(db: Session, batch_size: int) -> int:
+    return delete_expired_events(db, NOW.replace(tzinfo=timezone.utc), batch_size)
+
+
+def measure(
+    directory: Path,
+    name: str,
+    cleanup: Callable[[Session, int], int],
+    args: argparse.Namespace,
+) -> None:
+    engine = create_engine(f"sqlite:///{directory / f'{name}.db'}")
+    create_tables(engine)
+    seed(engine, args.expired, args.upcoming)
+
+    with Session(engine) as db:
+        tracemalloc.start()
+        started = time.perf_counter()
+        removed = cleanup(db, args.batch_size)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    engine.dispose()
+
+    print(
+        f"{name:8} removed={removed:<8} time={elapsed * 1000:9.1f} ms "
+        f"peak={peak / 2**20:7.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expired", type=int, default=100_000)
+    parser.add_argument("--upcoming", type=int, default=1_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        measure(Path(directory), "legacy", legacy_cleanup, args)
+        measure(Path(directory), "batched", batched_cleanup, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Deterministic synthetic events for seeding benchmark databases.
+
+Titles, descriptions, tags, venues and times follow skewed distributions
+like a real community calendar: a few popular tags and venues, evening
+starts, mostly short descriptions with a long tail.
+
+Run with ``python -m benchmarks.datagen --events 100000 --output events.db``
+to write a database for manual runs.
+"""
+
+import argparse
+import random
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Event,
+    bump_calendar_version,
+    create_tables,
+    make_engine,
+    new_uid,
+    sync_event_tags,
+)
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+WORDS = (
+    "open mic jazz night community garden workshop market farmers book club "
+    "film screening yoga park cleanup choir rehearsal pottery class chess "
+    "tournament library story time coding meetup bike repair potluck dinner "
+    "art walk gallery opening poetry reading trivia quiz dance social swap "
+    "family picnic history talk river walk craft fair winter festival concert"
+).split()
+TAGS = (
+    "music community family arts food outdoors education sports film "
+    "volunteering workshop kids seniors tech health dance theatre market "
+    "literature history"
+).split()
+# Start hours weighted towards evenings, as most community events are.
+START_HOURS = (10, 12, 14, 17, 18, 19, 20)
+START_HOUR_WEIGHTS = (2, 2, 2, 3, 5, 6, 4)
+DURATIONS = (1, 2, 2, 3, 4)
+
+
+def zipf_weights(count: int) -> list[float]:
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def generate_events(count: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    rng = random.Random(seed)
+    tag_weights = zipf_weights(len(TAGS))
+    venues = [f"Community Venue {index}" for index in range(200)]
+    venue_weights = zipf_weights(len(venues))
+
+    for index in range(count):
+        # A month of history and a year ahead, like a feed pruned by /cleanup.
+        day = NOW.date() + timedelta(days=rng.randrange(-30, 365))
+        hour = rng.choices(START_HOURS, START_HOUR_WEIGHTS)[0]
+        start = datetime(day.year, day.month, day.day, hour, rng.choice((0, 30)))
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 7))).title()
+        # Log-normal lengths: median around 250 characters, tail past 2000.
+        description_length = min(int(rng.lognormvariate(5.5, 0.8)), 4000)
+        description = " ".join(rng.choices(WORDS, k=description_length // 6 + 1))
+        tags = sorted(set(rng.choices(TAGS, tag_weights, k=rng.randint(0, 4))))
+        yield {
+            "title": f"{title} #{index}",
+            "start_time": start,
+            "end_time": start + timedelta(hours=rng.choice(DURATIONS)),
+            "description": description[:description_length],
+            "venue": rng.choices(venues, venue_weights)[0],
+            "url": f"https://example.com/events/{index}" if rng.random() < 0.6 else "",
+            "tags": ",".join(tags),
+            "uid": new_uid(),
+            "created": NOW,
+            "last_modified": NOW,
+            "version": 1,
+        }
+
+
+def seed_database(
+    engine: Engine, count: int, seed: int = 0, batch_size: int = 5000
+) -> None:
+    create_tables(engine)
+    events = generate_events(count, seed)
+    with Session(engine) as session:
+        conn = session.connection()
+        while batch := list(islice(events, batch_size)):
+            inserted = conn.execute(
+                insert(Event).returning(Event.id, Event.tags), batch
+            )
+            sync_event_tags(conn, inserted.tuples().all())
+        bump_calendar_version(session)
+        session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+
+    engine = make_engine(f"sqlite:///{args.output}")
+    seed_database(engine, args.events, args.seed)
+    engine.dispose()
+    print(f"wrote {args.events} events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
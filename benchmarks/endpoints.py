@@ -0,0 +1,236 @@
+"""Latency, throughput and peak RSS of the main endpoints at several sizes.
+
+Each size gets a fresh SQLite file seeded by ``benchmarks.datagen``; the
+routes run in-process through ``TestClient``. Results go to stdout as JSON
+(or ``--output``) so runs on different commits can be diffed, with a
+summary table on stderr.
+
+Run with ``python -m benchmarks.endpoints --sizes 1000 10000 100000``.
+"""
+
+import argparse
+import base64
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import feed_cache, fragment_cache
+from app.config import settings
+from app.models import get_db, get_read_db, make_engine
+from app.routers import calendar
+
+from .datagen import NOW, seed_database
+
+CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def reset_peak_rss() -> None:
+    # Linux lets a process reset its high-water mark, which makes the peak
+    # attributable to one scenario; elsewhere it stays process-wide.
+    try:
+        CLEAR_REFS.write_text("5")
+    except OSError:
+        pass
+
+
+def peak_rss_bytes() -> int:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def make_client(path: Path) -> TestClient:
+    engine = make_engine(f"sqlite:///{path}")
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(calendar.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    return TestClient(app)
+
+
+def measure(
+    name: str,
+    size: int,
+    requests: int,
+    call: Callable[[int], Response],
+    before: Callable[[], None] | None = None,
+) -> dict[str, Any]:
+    reset_peak_rss()
+    latencies = []
+    started = time.perf_counter()
+    for index in range(requests):
+        if before is not None:
+            before()
+        request_started = time.perf_counter()
+        response = call(index)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code}")
+    elapsed = time.perf_counter() - started
+    return {
+        "endpoint": name,
+        "events": size,
+        "requests": requests,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "bytes": len(response.content),
+    }
+
+
+def clear_feed_caches() -> None:
+    feed_cache.clear()
+    fragment_cache.clear()
+
+
+def new_event(index: int) -> dict[str, str]:
+    return {
+        "title": f"Benchmark Event {index}",
+        "start_time": NOW.isoformat(),
+        "end_time": NOW.replace(hour=14).isoformat(),
+        "description": "Added by the endpoint benchmark",
+        "venue": "Community Venue 0",
+    }
+
+
+def run_size(size: int, requests: int, directory: Path) -> list[dict[str, Any]]:
+    path = directory / f"events-{size}.db"
+    engine = make_engine(f"sqlite:///{path}")
+    seed_database(engine, size)
+    engine.dispose()
+    client = make_client(path)
+    credentials = f"{settings.auth_username}:{settings.auth_password}"
+    auth = {"Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
+    # Full renders are slow at the top size; fewer samples keep runs short.
+    renders = max(3, min(requests, 200_000 // size))
+
+    def get(
+        url: str, headers: dict[str, str] | None = None
+    ) -> Callable[[int], Response]:
+        return lambda index: client.get(url, headers=headers)
+
+    results = [
+        measure(
+            "get_calendar_cold", size, renders, get("/events.ics"), clear_feed_caches
+        ),
+        measure("get_calendar_cached", size, requests, get("/events.ics")),
+        measure(
+            "get_calendar_gzip",
+            size,
+            requests,
+            get("/events.ics", {"Accept-Encoding": "gzip"}),
+        ),
+        measure(
+            "get_calendar_tag",
+            size,
+            renders,
+            get("/events.ics?tag=music"),
+            clear_feed_caches,
+        ),
+        measure("get_events", size, requests, get("/events?limit=100", auth)),
+        measure(
+            "get_events_window",
+            size,
+            requests,
+            get(f"/events?limit=100&from={NOW.isoformat()}&tag=family", auth),
+        ),
+        # Writes last: each one invalidates the cached feeds above.
+        measure(
+            "add_event",
+            size,
+            requests,
+            lambda index: client.post(
+                "/add-event", json=new_event(index), headers=auth
+            ),
+        ),
+    ]
+    client.close()
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            results.extend(run_size(size, args.requests, Path(directory)))
+
+    for row in results:
+        print(
+            f"{row['endpoint']:<20} events={row['events']:<7} "
+            f"p50={row['p50_ms']:9.2f} ms p95={row['p95_ms']:9.2f} ms "
+            f"rps={row['throughput_rps']:8.1f} rss={row['peak_rss_bytes'] / 2**20:6.0f} MiB",
+            file=sys.stderr,
+        )
+
+    report = json.dumps(
+        {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output is None:
+        print(report)
+    else:
+        args.output.write_text(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time a feed rebuild after a single edit, with and without the fragment cache.
+
+Run with ``python -m benchmarks.fragment_cache --events 10000``.
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.cache import fragment_cache
+from app.models import Event, create_tables, make_engine, new_uid
+from app.queries import EventFilters
+from app.routers.calendar import _build_calendar
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+
+def seed(session: Session, count: int) -> None:
+    rows = []
+    for index in range(count):
+        start = NOW + timedelta(hours=index % 8760)
+        rows.append(
+            {
+                "title": f"Community Event {index}, Edition {index % 20}",
+                "start_time": start,
+                "end_time": start + timedelta(hours=2),
+                "description": "Join us for an evening of music; food, and friends. "
+                * (1 + index % 5),
+                "venue": f"Community Hall {index % 50}",
+                "url": f"https://example.com/events/{index}",
+                "tags": "music,community",
+                "uid": new_uid(),
+                "created": NOW,
+                "last_modified": NOW,
+                "version": 1,
+            }
+        )
+    session.execute(insert(Event), rows)
+    session.commit()
+
+
+def rebuild_after_edit(session: Session, revision: int) -> float:
+    # The version column's onupdate bumps it, evicting that one fragment.
+    first = select(Event.id).order_by(Event.id).limit(1).scalar_subquery()
+    session.execute(
+        update(Event).where(Event.id == first).values(title=f"Edited {revision}")
+    )
+    session.commit()
+
+    started = time.perf_counter()
+    _build_calendar(session, EventFilters())
+    elapsed = time.perf_counter() - started
+    session.expunge_all()
+    return elapsed * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{Path(directory) / 'fragments.db'}")
+        create_tables(engine)
+        with Session(engine) as session:
+            seed(session, args.events)
+
+            cold = []
+            for revision in range(args.repeat):
+                fragment_cache.clear()
+                cold.append(rebuild_after_edit(session, revision))
+
+            _build_calendar(session, EventFilters())
+            session.expunge_all()
+            warm = [
+                rebuild_after_edit(session, revision)
+                for revision in range(args.repeat, 2 * args.repeat)
+            ]
+        engine.dispose()
+
+    print(f"events:          {args.events}")
+    print(f"full render:     {min(cold):8.1f} ms")
+    print(f"fragment cache:  {min(warm):8.1f} ms")
+    print(f"cached bytes:    {fragment_cache.size / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare the hand-rolled ICS writer with the icalendar object model.
+
+Run with ``python -m benchmarks.ics_writer --events 10000``.
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable
+
+from icalendar import Calendar, Event as ICalEvent
+
+from app.ics import CALENDAR_FOOTER, calendar_header, render_event
+
+PRODID = "-//Community Events Calendar//EN"
+TAGS = ["music", "outdoor", "family", "food", "art", "sports"]
+
+
+def make_rows(count: int, seed: int = 0) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1, 18, 0, 0)
+    rows = []
+    for index in range(count):
+        start = base + timedelta(hours=rng.randrange(0, 24 * 365))
+        rows.append(
+            SimpleNamespace(
+                title=f"Community Event {index}, Edition {rng.randrange(1, 20)}",
+                start_time=start,
+                end_time=start + timedelta(hours=rng.choice((1, 2, 3))),
+                description="Join us for an evening of music; food, and friends. "
+                * rng.randrange(1, 6),
+                venue=f"Community Hall {rng.randrange(1, 50)}",
+                url=f"https://example.com/events/{index}",
+                tags=",".join(rng.sample(TAGS, rng.randrange(0, 4))),
+                uid=str(uuid.uuid4()),
+                created=start - timedelta(days=30),
+                last_modified=start - timedelta(days=rng.randrange(0, 30)),
+            )
+        )
+    return rows
+
+
+def icalendar_feed(rows: list[SimpleNamespace]) -> bytes:
+    cal = Calendar()
+    cal.add("prodid", PRODID)
+    cal.add("version", "2.0")
+    cal.add("calscale", "GREGORIAN")
+    cal.add("method", "PUBLISH")
+    for row in rows:
+        ical_event = ICalEvent()
+        ical_event.add("uid", row.uid)
+        ical_event.add("dtstart", row.start_time)
+        ical_event.add("dtend", row.end_time)
+        ical_event.add("summary", row.title)
+        ical_event.add("description", row.description)
+        ical_event.add("location", row.venue)
+        ical_event.add("url", row.url)
+        ical_event.add("dtstamp", row.last_modified.replace(tzinfo=timezone.utc))
+        ical_event.add("created", row.created.replace(tzinfo=timezone.utc))
+        ical_event.add("last-modified", row.last_modified.replace(tzinfo=timezone.utc))
+        if row.tags:
+            ical_event.add("categories", row.tags.split(","))
+        cal.add_component(ical_event)
+    return cal.to_ical()
+
+
+def fast_feed(rows: list[SimpleNamespace]) -> bytes:
+    return (
+        calendar_header(PRODID)
+        + b"".join(render_event(row) for row in rows)
+        + CALENDAR_FOOTER
+    )
+
+
+def best_of(repeat: int, build: Callable[[], bytes]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.events)
+    assert icalendar_feed(rows) == fast_feed(rows)
+
+    reference = best_of(args.repeat, lambda: icalendar_feed(rows))
+    fast = best_of(args.repeat, lambda: fast_feed(rows))
+
+    print(f"events:     {args.events}")
+    print(f"icalendar:  {reference * 1000:9.1f} ms")
+    print(f"ics writer: {fast * 1000:9.1f} ms")
+    print(f"speedup:    {reference / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time the per-request cost of the metrics middleware and SQL hooks.
+
+Run with ``python -m benchmarks.metrics_overhead --requests 100000``.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.metrics import MetricsMiddleware, instrument_engine
+
+
+class Route:
+    path = "/events.ics"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = Route()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET"}, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def query_cost(engine, queries: int) -> float:
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(queries):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / queries * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Best of several interleaved rounds, since the differences are small
+    # next to run-to-run noise.
+    middleware = MetricsMiddleware(endpoint)
+    bare = min(asyncio.run(drive(endpoint, args.requests)) for _ in range(args.repeat))
+    wrapped = min(
+        asyncio.run(drive(middleware, args.requests)) for _ in range(args.repeat)
+    )
+    print(f"middleware:  {wrapped - bare:6.2f} us/request")
+
+    plain = create_engine("sqlite://")
+    instrumented = create_engine("sqlite://")
+    instrument_engine(instrumented, "benchmark")
+    plain_cost = instrumented_cost = float("inf")
+    for _ in range(args.repeat):
+        plain_cost = min(plain_cost, query_cost(plain, args.requests))
+        instrumented_cost = min(
+            instrumented_cost, query_cost(instrumented, args.requests)
+        )
+    print(f"SQL hooks:   {instrumented_cost - plain_cost:6.2f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare ORM instances with plain column rows for large event listings.
+
+Loads every event both ways and serializes it to JSON as /events does,
+reporting time per row and peak traced memory.
+
+Run with ``python -m benchmarks.projections --events 100000``.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Event, make_engine
+from app.queries import EVENT_COLUMNS
+from app.routers.calendar import _rows_json
+
+from .datagen import seed_database
+
+
+def load_instances(session: Session) -> list[Any]:
+    return list(session.scalars(select(Event)).all())
+
+
+def load_rows(session: Session) -> list[Any]:
+    return list(session.execute(select(*EVENT_COLUMNS)).all())
+
+
+def measure(
+    session: Session, load: Callable[[Session], list[Any]], encode: Callable
+) -> tuple[float, float, float]:
+    session.expunge_all()
+    started = time.perf_counter()
+    rows = load(session)
+    loaded = time.perf_counter()
+    encode(rows)
+    encoded = time.perf_counter()
+    count = len(rows)
+    del rows
+
+    # Tracing slows everything down, so memory gets a separate pass.
+    session.expunge_all()
+    tracemalloc.start()
+    encode(load(session))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.expunge_all()
+    return (
+        (loaded - started) / count * 1e6,
+        (encoded - loaded) / count * 1e6,
+        peak / count,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{Path(directory) / 'projections.db'}")
+        seed_database(engine, args.events)
+        with Session(engine) as session:
+            cases = {
+                "ORM instances": (
+                    load_instances,
+                    lambda rows: JSONResponse(jsonable_encoder(rows)).body,
+                ),
+                "column rows": (load_rows, _rows_json),
+            }
+            for name, (load, encode) in cases.items():
+                load_us, encode_us, peak = measure(session, load, encode)
+                print(
+                    f"{name:<14} load={load_us:6.2f} us/row "
+                    f"json={encode_us:6.2f} us/row peak={peak:7.0f} B/row"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
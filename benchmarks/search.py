@@ -0,0 +1,119 @@
+"""Compare FTS5 search with LIKE scans over title, description and venue.
+
+Run with ``python -m benchmarks.search --events 100000``.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import Select, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Event, create_tables, make_engine, new_uid
+from app.queries import EventFilters, search_expression, search_query
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+SYLLABLES = "ba ce di fo gu ha je ki lo mu na pe ri so tu va we xi yo zu".split()
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randrange(2, 5))))
+    return sorted(words)
+
+
+def seed(session: Session, count: int) -> list[str]:
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, 5000)
+    # Word frequencies follow a Zipf-like curve, as in natural text.
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    rows = []
+    for index in range(count):
+        start = NOW + timedelta(hours=index % 8760)
+        rows.append(
+            {
+                "title": " ".join(rng.choices(vocabulary, weights, k=4)).title(),
+                "start_time": start,
+                "end_time": start + timedelta(hours=2),
+                "description": " ".join(rng.choices(vocabulary, weights, k=60)),
+                "venue": f"{rng.choice(vocabulary).title()} Hall {index % 50}",
+                "url": "",
+                "tags": "",
+                "uid": new_uid(),
+                "created": NOW,
+                "last_modified": NOW,
+            }
+        )
+    session.execute(insert(Event), rows)
+    session.commit()
+    # Mid- and low-frequency words, a two-word query, a partial word and a
+    # term that matches nothing (the worst case for a LIKE scan).
+    return [
+        vocabulary[200],
+        vocabulary[1500],
+        vocabulary[4000],
+        f"{vocabulary[100]} {vocabulary[300]}",
+        vocabulary[2500][:4],
+        "qqqq",
+    ]
+
+
+def like_query(terms: str, limit: int) -> Select[Any]:
+    clauses = [
+        or_(
+            Event.title.contains(term),
+            Event.description.contains(term),
+            Event.venue.contains(term),
+        )
+        for term in terms.split()
+    ]
+    return select(Event).where(*clauses).order_by(Event.id).limit(limit)
+
+
+def fts_query(terms: str, limit: int) -> Select[Any]:
+    expression = search_expression(terms)
+    assert expression is not None
+    return search_query(expression, EventFilters(), 0, limit)
+
+
+def measure(
+    session: Session,
+    build: Callable[[str, int], Select[Any]],
+    terms: str,
+    repeat: int,
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        session.scalars(build(terms, 20)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+        session.expunge_all()
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{Path(directory) / 'search.db'}")
+        create_tables(engine)
+        with Session(engine) as session:
+            for terms in seed(session, args.events):
+                like = measure(session, like_query, terms, args.repeat)
+                fts = measure(session, fts_query, terms, args.repeat)
+                print(f"{terms!r:24} like={like:8.2f} ms  fts={fts:8.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Concurrent read/write throughput with and without the SQLite pragma profile.
+
+Readers page through GET /events style queries while writers insert events
+one transaction at a time, mirroring feed polls competing with admin writes.
+
+Run with ``python -m benchmarks.sqlite_pragmas --seconds 5``.
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Mapping
+
+from sqlalchemy import Engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models import Event, create_tables, make_engine, new_uid, sqlite_pragmas
+from app.queries import EventFilters, events_page_query
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+
+def event_row(index: int) -> dict[str, object]:
+    start = NOW + timedelta(hours=index % 8760)
+    return {
+        "title": f"Event {index}",
+        "start_time": start,
+        "end_time": start + timedelta(hours=2),
+        "description": "Benchmark event " * 8,
+        "venue": f"Venue {index % 50}",
+        "url": "",
+        "tags": "music,community",
+        "uid": new_uid(),
+        "created": NOW,
+        "last_modified": NOW,
+    }
+
+
+def run(engine: Engine, seconds: float, readers: int, writers: int) -> dict[str, int]:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def record(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def reader() -> None:
+        with Session(engine) as db:
+            while time.perf_counter() < deadline:
+                try:
+                    db.execute(events_page_query(EventFilters(), None, 100)).all()
+                    db.rollback()
+                    record("reads")
+                except OperationalError:
+                    db.rollback()
+                    record("errors")
+
+    def writer(offset: int) -> None:
+        index = offset
+        with Session(engine) as db:
+            while time.perf_counter() < deadline:
+                try:
+                    db.execute(insert(Event), [event_row(index)])
+                    db.commit()
+                    record("writes")
+                except OperationalError:
+                    db.rollback()
+                    record("errors")
+                index += writers
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [
+        threading.Thread(target=writer, args=(1_000_000 + offset,))
+        for offset in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def measure(
+    directory: Path,
+    name: str,
+    pragmas: Mapping[str, str | int],
+    args: argparse.Namespace,
+) -> None:
+    engine = make_engine(f"sqlite:///{directory / f'{name}.db'}", pragmas)
+    create_tables(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Event), [event_row(index) for index in range(args.events)])
+
+    counts = run(engine, args.seconds, args.readers, args.writers)
+    engine.dispose()
+
+    print(
+        f"{name:8} reads/s={counts['reads'] / args.seconds:9.1f} "
+        f"writes/s={counts['writes'] / args.seconds:9.1f} errors={counts['errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        measure(Path(directory), "defaults", {"busy_timeout": 5000}, args)
+        measure(Path(directory), "profile", sqlite_pragmas(), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import base64
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+test_env = {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "AUTH_USERNAME": "admin",
+    "AUTH_PASSWORD": "test_password",
+    "APP_TITLE": "Test Calendar",
+    "APP_DESCRIPTION": "Test Description",
+    "CALENDAR_PRODID": "-//Test Calendar//EN",
+    # Most tests read the feed right after writing; the stale-while-revalidate
+    # tests turn it back on.
+    "FEED_STALE_WHILE_REVALIDATE": "false",
+}
+
+with patch.dict(os.environ, test_env), patch("app.models.create_tables"):
+    from app.cache import feed_cache, fragment_cache
+    from app.main import app
+    from app.metrics import instrument_engine
+    from app import models
+    from app.models import get_db, get_read_db
+
+
+@pytest.fixture(autouse=True)
+def reset_feed_cache():
+    feed_cache.clear()
+    fragment_cache.clear()
+    yield
+    feed_cache.clear()
+    fragment_cache.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers():
+    credentials = base64.b64encode(b"admin:test_password").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    url = f"sqlite:///{tmp_path / 'events.db'}"
+    engine = models.make_engine(url)
+    models.create_tables(engine)
+    read_engine = models.make_read_engine(url)
+    instrument_engine(engine, "primary")
+    instrument_engine(read_engine, "read")
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    testing_read_session_local = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_engine
+    )
+
+    def override_get_db():
+        db = testing_session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def override_get_read_db():
+        db = testing_read_session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    try:
+        yield testing_session_local
+    finally:
+        app.dependency_overrides.clear()
+        read_engine.dispose()
+        engine.dispose()
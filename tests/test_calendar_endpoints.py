@@ -1,35 +1,47 @@
+import asyncio
 import base64
-import os
+import json
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from unittest.mock import Mock, patch
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+from fastapi.encoders import jsonable_encoder
 from icalendar import Calendar
-
-test_env = {
-    "DATABASE_URL": "sqlite:///:memory:",
-    "AUTH_USERNAME": "admin",
-    "AUTH_PASSWORD": "test_password",
-    "APP_TITLE": "Test Calendar",
-    "APP_DESCRIPTION": "Test Description",
-    "CALENDAR_PRODID": "-//Test Calendar//EN",
-}
-
-with patch.dict(os.environ, test_env), patch("app.models.create_tables"):
-    from app.main import app
-    from app.models import get_db
-
-
-@pytest.fixture
-def client():
-    return TestClient(app)
-
-
-@pytest.fixture
-def auth_headers():
-    credentials = base64.b64encode(b"admin:test_password").decode("ascii")
-    return {"Authorization": f"Basic {credentials}"}
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import FeedCache, FeedSnapshot, FragmentCache, feed_cache
+from app.importer import EventImporter
+from app.main import app
+from app.models import (
+    Event,
+    bump_calendar_version,
+    create_tables,
+    get_db,
+    get_read_db,
+)
+from app.queries import EventFilters, tag_facets_query
+from app.routers import calendar as calendar_router
+
+
+EventRow = namedtuple(
+    "EventRow",
+    ["id", "title", "start_time", "end_time", "description", "venue", "url", "tags"],
+)
+
+
+def add_events(session_factory, *events):
+    with session_factory() as db:
+        db.add_all(events)
+        bump_calendar_version(db)
+        db.commit()
+        for event in events:
+            db.refresh(event)
 
 
 def test_add_event_missing_required_fields(client, auth_headers):
@@ -56,7 +68,7 @@ def test_add_event_invalid_datetime_format(client, auth_headers):
 
 
 def test_add_event_success(client, auth_headers):
-    mock_db_session = Mock()
+    mock_db_session = Mock(info={})
 
     def override_get_db():
         return mock_db_session
@@ -99,7 +111,7 @@ def test_add_event_success(client, auth_headers):
 
 
 def test_add_event_with_tags(client, auth_headers):
-    mock_db_session = Mock()
+    mock_db_session = Mock(info={})
 
     def override_get_db():
         return mock_db_session
@@ -133,7 +145,7 @@ def test_add_event_with_tags(client, auth_headers):
 
 
 def test_add_event_minimal_data(client, auth_headers):
-    mock_db_session = Mock()
+    mock_db_session = Mock(info={})
 
     def override_get_db():
         return mock_db_session
@@ -180,32 +192,67 @@ def test_add_event_unauthenticated(client):
     assert response.status_code == 401
 
 
-def test_cleanup_past_events_success(client, auth_headers):
-    mock_db_session = Mock()
+def past_event(title):
+    return sample_event(
+        title,
+        start_time=datetime(2020, 1, 1, 19, 0, 0),
+        end_time=datetime(2020, 1, 1, 21, 0, 0),
+    )
 
-    past_event1 = Mock()
-    past_event2 = Mock()
-    mock_db_session.query.return_value.filter.return_value.all.return_value = [
-        past_event1,
-        past_event2,
-    ]
 
-    def override_get_db():
-        return mock_db_session
+def future_event(title):
+    return sample_event(
+        title,
+        start_time=datetime(2999, 1, 1, 19, 0, 0),
+        end_time=datetime(2999, 1, 1, 21, 0, 0),
+    )
 
-    app.dependency_overrides[get_db] = override_get_db
 
-    try:
+def test_cleanup_past_events_success(client, auth_headers, session_factory):
+    add_events(
+        session_factory,
+        past_event("Past 1"),
+        past_event("Past 2"),
+        future_event("Upcoming"),
+    )
+
+    response = client.post("/cleanup", headers=auth_headers)
+
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["message"] == "Removed 2 past events"
+
+    with session_factory() as db:
+        assert [event.title for event in db.query(Event).all()] == ["Upcoming"]
+
+
+def test_cleanup_past_events_in_batches(client, auth_headers, session_factory):
+    add_events(
+        session_factory,
+        *[past_event(f"Past {index}") for index in range(5)],
+        future_event("Upcoming"),
+    )
+    etag = client.get("/events.ics").headers["ETag"]
+
+    with patch.object(calendar_router.settings, "cleanup_batch_size", 2):
         response = client.post("/cleanup", headers=auth_headers)
 
-        assert response.status_code == 200
-        response_data = response.json()
-        assert response_data["message"] == "Removed 2 past events"
+    assert response.json()["message"] == "Removed 5 past events"
+    with session_factory() as db:
+        assert db.query(Event).count() == 1
+    assert client.get("/events.ics").headers["ETag"] != etag
 
-        assert mock_db_session.delete.call_count == 2
-        mock_db_session.commit.assert_called_once()
-    finally:
-        app.dependency_overrides.clear()
+
+def test_cleanup_without_past_events_keeps_feed_version(
+    client, auth_headers, session_factory
+):
+    add_events(session_factory, future_event("Upcoming"))
+    etag = client.get("/events.ics").headers["ETag"]
+
+    response = client.post("/cleanup", headers=auth_headers)
+
+    assert response.json()["message"] == "Removed 0 past events"
+    assert client.get("/events.ics").headers["ETag"] == etag
 
 
 def test_cleanup_past_events_unauthenticated(client):
@@ -216,54 +263,33 @@ def test_cleanup_past_events_unauthenticated(client):
 def test_get_events_success(client, auth_headers):
     mock_db_session = Mock()
 
-    mock_event1 = Mock(
-        spec=[
-            "id",
-            "title",
-            "start_time",
-            "end_time",
-            "description",
-            "venue",
-            "url",
-            "tags",
-        ]
+    event1 = EventRow(
+        id=1,
+        title="Event 1",
+        start_time=datetime(2025, 7, 1, 19, 0, 0),
+        end_time=datetime(2025, 7, 1, 21, 0, 0),
+        description="First event",
+        venue="Venue 1",
+        url="https://example1.com",
+        tags="music,outdoor",
     )
-    mock_event1.id = 1
-    mock_event1.title = "Event 1"
-    mock_event1.start_time = datetime(2025, 7, 1, 19, 0, 0)
-    mock_event1.end_time = datetime(2025, 7, 1, 21, 0, 0)
-    mock_event1.description = "First event"
-    mock_event1.venue = "Venue 1"
-    mock_event1.url = "https://example1.com"
-    mock_event1.tags = "music,outdoor"
-
-    mock_event2 = Mock(
-        spec=[
-            "id",
-            "title",
-            "start_time",
-            "end_time",
-            "description",
-            "venue",
-            "url",
-            "tags",
-        ]
+    event2 = EventRow(
+        id=2,
+        title="Event 2",
+        start_time=datetime(2025, 7, 2, 19, 0, 0),
+        end_time=datetime(2025, 7, 2, 21, 0, 0),
+        description="Second event",
+        venue="Venue 2",
+        url="https://example2.com",
+        tags="family",
     )
-    mock_event2.id = 2
-    mock_event2.title = "Event 2"
-    mock_event2.start_time = datetime(2025, 7, 2, 19, 0, 0)
-    mock_event2.end_time = datetime(2025, 7, 2, 21, 0, 0)
-    mock_event2.description = "Second event"
-    mock_event2.venue = "Venue 2"
-    mock_event2.url = "https://example2.com"
-    mock_event2.tags = "family"
 
-    mock_db_session.query.return_value.all.return_value = [mock_event1, mock_event2]
+    mock_db_session.execute.return_value.all.return_value = [event1, event2]
 
     def override_get_db():
         return mock_db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     try:
         response = client.get("/events", headers=auth_headers)
@@ -281,12 +307,12 @@ def test_get_events_success(client, auth_headers):
 
 def test_get_events_empty_list(client, auth_headers):
     mock_db_session = Mock()
-    mock_db_session.query.return_value.all.return_value = []
+    mock_db_session.execute.return_value.all.return_value = []
 
     def override_get_db():
         return mock_db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     try:
         response = client.get("/events", headers=auth_headers)
@@ -304,7 +330,7 @@ def test_get_events_unauthenticated(client):
 
 
 def test_delete_event_success(client, auth_headers):
-    mock_db_session = Mock()
+    mock_db_session = Mock(info={})
 
     mock_event = Mock()
     mock_event.id = 1
@@ -364,171 +390,1363 @@ def test_delete_event_unauthenticated(client):
     assert response.status_code == 401
 
 
-def test_get_calendar_empty(client):
+def test_get_calendar_empty(client, session_factory):
+    response = client.get("/events.ics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert "Content-Disposition" in response.headers
+    assert "events.ics" in response.headers["Content-Disposition"]
+
+    calendar_text = response.text
+    assert "BEGIN:VCALENDAR" in calendar_text
+    assert "END:VCALENDAR" in calendar_text
+    assert "PRODID:-//Test Calendar//EN" in calendar_text
+    assert "VERSION:2.0" in calendar_text
+
+
+def test_get_calendar_with_events(client, session_factory):
+    add_events(
+        session_factory,
+        Event(
+            title="Test Event",
+            start_time=datetime(2025, 7, 1, 19, 0, 0),
+            end_time=datetime(2025, 7, 1, 21, 0, 0),
+            description="A test event for the calendar",
+            venue="Test Venue",
+            url="https://example.com",
+            uid="test-uuid-123",
+            created=datetime(2025, 6, 1, 9, 0, 0, tzinfo=timezone.utc),
+            last_modified=datetime(2025, 6, 28, 12, 0, 0, tzinfo=timezone.utc),
+        ),
+    )
+
+    response = client.get("/events.ics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+
+    calendar_text = response.text
+    assert "BEGIN:VCALENDAR" in calendar_text
+    assert "END:VCALENDAR" in calendar_text
+    assert "BEGIN:VEVENT" in calendar_text
+    assert "END:VEVENT" in calendar_text
+    assert "SUMMARY:Test Event" in calendar_text
+    assert "LOCATION:Test Venue" in calendar_text
+    assert "DESCRIPTION:A test event for the calendar" in calendar_text
+    assert "URL:https://example.com" in calendar_text
+    assert "UID:test-uuid-123" in calendar_text
+    assert "DTSTAMP:20250628T120000Z" in calendar_text
+    assert "CREATED:20250601T090000Z" in calendar_text
+    assert "LAST-MODIFIED:20250628T120000Z" in calendar_text
+
+
+def test_get_calendar_multiple_events(client, session_factory):
+    add_events(
+        session_factory,
+        Event(
+            title="Event 1",
+            start_time=datetime(2025, 7, 1, 19, 0, 0),
+            end_time=datetime(2025, 7, 1, 21, 0, 0),
+            description="First event",
+            venue="Venue 1",
+            url="https://example1.com",
+        ),
+        Event(
+            title="Event 2",
+            start_time=datetime(2025, 7, 2, 19, 0, 0),
+            end_time=datetime(2025, 7, 2, 21, 0, 0),
+            description="Second event",
+            venue="Venue 2",
+            url="https://example2.com",
+        ),
+    )
+
+    response = client.get("/events.ics")
+
+    assert response.status_code == 200
+    calendar_text = response.text
+
+    assert calendar_text.count("BEGIN:VEVENT") == 2
+    assert calendar_text.count("END:VEVENT") == 2
+    assert "SUMMARY:Event 1" in calendar_text
+    assert "SUMMARY:Event 2" in calendar_text
+    assert "LOCATION:Venue 1" in calendar_text
+    assert "LOCATION:Venue 2" in calendar_text
+
+
+def test_get_calendar_validates_ical_format(client, session_factory):
+    add_events(
+        session_factory,
+        Event(
+            title="Test Event",
+            start_time=datetime(2025, 7, 1, 19, 0, 0),
+            end_time=datetime(2025, 7, 1, 21, 0, 0),
+            description="A test event for the calendar",
+            venue="Test Venue",
+            url="https://example.com",
+        ),
+    )
+
+    response = client.get("/events.ics")
+
+    assert response.status_code == 200
+
+    calendar = Calendar.from_ical(response.content)
+    assert calendar is not None
+
+    events = [component for component in calendar.walk() if component.name == "VEVENT"]
+    assert len(events) == 1
+
+    event = events[0]
+    assert event.get("summary") == "Test Event"
+    assert event.get("location") == "Test Venue"
+    assert event.get("description") == "A test event for the calendar"
+
+
+def test_get_calendar_database_error_handled_gracefully(client):
     mock_db_session = Mock()
-    mock_db_session.query.return_value.all.return_value = []
+    mock_db_session.query.side_effect = Exception("Database connection error")
 
     def override_get_db():
         return mock_db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     try:
         response = client.get("/events.ics")
-
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "text/calendar; charset=utf-8"
-        assert "Content-Disposition" in response.headers
-        assert "events.ics" in response.headers["Content-Disposition"]
-
-        calendar_text = response.text
-        assert "BEGIN:VCALENDAR" in calendar_text
-        assert "END:VCALENDAR" in calendar_text
-        assert "PRODID:-//Test Calendar//EN" in calendar_text
-        assert "VERSION:2.0" in calendar_text
+        assert response.status_code in [200, 500]
+    except Exception:
+        pass
     finally:
         app.dependency_overrides.clear()
 
 
-@patch("app.routers.calendar.uuid.uuid4")
-@patch("app.routers.calendar.datetime")
-def test_get_calendar_with_events(mock_datetime, mock_uuid, client):
-    mock_db_session = Mock()
+def sample_event(title="Sample Event", **overrides):
+    fields = {
+        "title": title,
+        "start_time": datetime(2025, 7, 1, 19, 0, 0),
+        "end_time": datetime(2025, 7, 1, 21, 0, 0),
+        "description": "A test event for the calendar",
+        "venue": "Test Venue",
+        "url": "",
+    }
+    fields.update(overrides)
+    return Event(**fields)
+
+
+def test_get_calendar_served_from_cache(client, session_factory):
+    add_events(session_factory, sample_event("Cached Event"))
+
+    with patch(
+        "app.routers.calendar._build_calendar",
+        wraps=calendar_router._build_calendar,
+    ) as build_calendar:
+        first = client.get("/events.ics")
+        second = client.get("/events.ics")
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.content == second.content
+    assert "SUMMARY:Cached Event" in second.text
+    build_calendar.assert_called_once()
+
+
+def test_add_event_invalidates_calendar_cache(client, auth_headers, session_factory):
+    client.get("/events.ics")
+
+    event_data = {
+        "title": "New Event",
+        "start_time": "2025-07-01T19:00:00",
+        "end_time": "2025-07-01T21:00:00",
+        "description": "Added after the feed was cached",
+        "venue": "Test Venue",
+    }
+    response = client.post("/add-event", json=event_data, headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get("/events.ics")
+    assert "SUMMARY:New Event" in response.text
+
+
+def test_delete_event_invalidates_calendar_cache(client, auth_headers, session_factory):
+    event = sample_event("Doomed Event")
+    add_events(session_factory, event)
+    assert "SUMMARY:Doomed Event" in client.get("/events.ics").text
+
+    response = client.delete(f"/events/{event.id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    assert "SUMMARY:Doomed Event" not in client.get("/events.ics").text
+
+
+def test_get_calendar_sets_validators(client, session_factory):
+    response = client.get("/events.ics")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert "GMT" in response.headers["Last-Modified"]
 
-    mock_uuid.return_value = "test-uuid-123"
-    mock_datetime.now.return_value = datetime(
-        2025, 6, 28, 12, 0, 0, tzinfo=timezone.utc
+
+def test_get_calendar_if_none_match_returns_304(client, session_factory):
+    etag = client.get("/events.ics").headers["ETag"]
+
+    with patch("app.routers.calendar._build_calendar") as build_calendar:
+        response = client.get("/events.ics", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    build_calendar.assert_not_called()
+
+
+def test_get_calendar_if_none_match_weak_and_list(client, session_factory):
+    etag = client.get("/events.ics").headers["ETag"]
+
+    response = client.get(
+        "/events.ics", headers={"If-None-Match": f'"other", W/{etag}'}
     )
 
-    sample_event = Mock()
-    sample_event.title = "Test Event"
-    sample_event.start_time = datetime(2025, 7, 1, 19, 0, 0)
-    sample_event.end_time = datetime(2025, 7, 1, 21, 0, 0)
-    sample_event.description = "A test event for the calendar"
-    sample_event.venue = "Test Venue"
-    sample_event.url = "https://example.com"
+    assert response.status_code == 304
 
-    mock_db_session.query.return_value.all.return_value = [sample_event]
 
-    def override_get_db():
-        return mock_db_session
+def test_get_calendar_etag_changes_after_write(client, session_factory):
+    etag = client.get("/events.ics").headers["ETag"]
 
-    app.dependency_overrides[get_db] = override_get_db
+    add_events(session_factory, sample_event())
 
-    try:
-        response = client.get("/events.ics")
+    response = client.get("/events.ics", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "SUMMARY:Sample Event" in response.text
 
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "text/calendar; charset=utf-8"
-
-        calendar_text = response.text
-        assert "BEGIN:VCALENDAR" in calendar_text
-        assert "END:VCALENDAR" in calendar_text
-        assert "BEGIN:VEVENT" in calendar_text
-        assert "END:VEVENT" in calendar_text
-        assert "SUMMARY:Test Event" in calendar_text
-        assert "LOCATION:Test Venue" in calendar_text
-        assert "DESCRIPTION:A test event for the calendar" in calendar_text
-        assert "URL:https://example.com" in calendar_text
-        assert "UID:test-uuid-123" in calendar_text
-    finally:
-        app.dependency_overrides.clear()
 
+def test_get_calendar_if_modified_since(client, session_factory):
+    last_modified = client.get("/events.ics").headers["Last-Modified"]
 
-def test_get_calendar_multiple_events(client):
-    mock_db_session = Mock()
+    response = client.get("/events.ics", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
 
-    event1 = Mock()
-    event1.title = "Event 1"
-    event1.start_time = datetime(2025, 7, 1, 19, 0, 0)
-    event1.end_time = datetime(2025, 7, 1, 21, 0, 0)
-    event1.description = "First event"
-    event1.venue = "Venue 1"
-    event1.url = "https://example1.com"
+    response = client.get(
+        "/events.ics", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
 
-    event2 = Mock()
-    event2.title = "Event 2"
-    event2.start_time = datetime(2025, 7, 2, 19, 0, 0)
-    event2.end_time = datetime(2025, 7, 2, 21, 0, 0)
-    event2.description = "Second event"
-    event2.venue = "Venue 2"
-    event2.url = "https://example2.com"
 
-    mock_db_session.query.return_value.all.return_value = [event1, event2]
+def test_get_calendar_if_none_match_takes_precedence(client, session_factory):
+    last_modified = client.get("/events.ics").headers["Last-Modified"]
 
-    def override_get_db():
-        return mock_db_session
+    response = client.get(
+        "/events.ics",
+        headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified},
+    )
 
-    app.dependency_overrides[get_db] = override_get_db
+    assert response.status_code == 200
 
-    try:
+
+def test_get_calendar_invalid_if_modified_since_ignored(client, session_factory):
+    response = client.get("/events.ics", headers={"If-Modified-Since": "yesterday"})
+
+    assert response.status_code == 200
+
+
+def test_get_calendar_streaming(client, session_factory):
+    add_events(
+        session_factory,
+        sample_event("Streamed 1"),
+        sample_event("Streamed 2"),
+        sample_event("Streamed 3"),
+    )
+
+    with (
+        patch.object(calendar_router.settings, "ics_streaming", True),
+        patch.object(calendar_router.settings, "ics_stream_batch_size", 2),
+    ):
         response = client.get("/events.ics")
 
-        assert response.status_code == 200
-        calendar_text = response.text
-
-        assert calendar_text.count("BEGIN:VEVENT") == 2
-        assert calendar_text.count("END:VEVENT") == 2
-        assert "SUMMARY:Event 1" in calendar_text
-        assert "SUMMARY:Event 2" in calendar_text
-        assert "LOCATION:Venue 1" in calendar_text
-        assert "LOCATION:Venue 2" in calendar_text
-    finally:
-        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert "events.ics" in response.headers["Content-Disposition"]
+    assert "ETag" in response.headers
 
+    calendar = Calendar.from_ical(response.content)
+    summaries = [str(component.get("summary")) for component in calendar.walk("VEVENT")]
+    assert summaries == ["Streamed 1", "Streamed 2", "Streamed 3"]
+    assert feed_cache.get(EventFilters(), response.headers["ETag"]) is None
 
-def test_get_calendar_validates_ical_format(client):
-    mock_db_session = Mock()
 
-    sample_event = Mock()
-    sample_event.title = "Test Event"
-    sample_event.start_time = datetime(2025, 7, 1, 19, 0, 0)
-    sample_event.end_time = datetime(2025, 7, 1, 21, 0, 0)
-    sample_event.description = "A test event for the calendar"
-    sample_event.venue = "Test Venue"
-    sample_event.url = "https://example.com"
+def test_get_calendar_streaming_if_none_match(client, session_factory):
+    with patch.object(calendar_router.settings, "ics_streaming", True):
+        etag = client.get("/events.ics").headers["ETag"]
+        response = client.get("/events.ics", headers={"If-None-Match": etag})
 
-    mock_db_session.query.return_value.all.return_value = [sample_event]
+    assert response.status_code == 304
 
-    def override_get_db():
-        return mock_db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+def test_get_calendar_output_is_deterministic(client, session_factory):
+    add_events(session_factory, sample_event("Stable Event"))
 
-    try:
+    first = client.get("/events.ics")
+    feed_cache.clear()
+    second = client.get("/events.ics")
+
+    assert first.content == second.content
+
+
+def test_add_event_persists_uid_and_timestamps(client, auth_headers, session_factory):
+    event_data = {
+        "title": "Persisted Event",
+        "start_time": "2025-07-01T19:00:00",
+        "end_time": "2025-07-01T21:00:00",
+        "description": "Has a stable identity",
+        "venue": "Test Venue",
+    }
+
+    response = client.post("/add-event", json=event_data, headers=auth_headers)
+    event_id = int(response.json()["event_id"])
+
+    with session_factory() as db:
+        event = db.get(Event, event_id)
+        assert event.uid
+        assert event.created is not None
+        assert event.last_modified == event.created
+
+    calendar_text = client.get("/events.ics").text
+    assert f"UID:{event.uid}" in calendar_text
+
+
+def test_create_tables_migrates_existing_events(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "start_time DATETIME NOT NULL, end_time DATETIME NOT NULL, "
+            "description TEXT NOT NULL, venue VARCHAR NOT NULL, url VARCHAR, "
+            "tags VARCHAR)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO events (title, start_time, end_time, description, venue) "
+            "VALUES ('Old', '2025-07-01 19:00:00', '2025-07-01 21:00:00', 'd', 'v'), "
+            "('Older', '2025-07-02 19:00:00', '2025-07-02 21:00:00', 'd', 'v')"
+        )
+        conn.exec_driver_sql(
+            "UPDATE events SET tags = CASE title "
+            "WHEN 'Old' THEN 'music, jazz' ELSE 'music' END"
+        )
+
+    create_tables(engine)
+
+    with sessionmaker(bind=engine)() as db:
+        events = db.query(Event).all()
+    assert len({event.uid for event in events}) == 2
+    with engine.connect() as conn:
+        facets = conn.execute(tag_facets_query(EventFilters())).tuples().all()
+    assert facets == [("music", 2), ("jazz", 1)]
+    assert all(event.created and event.last_modified for event in events)
+    assert all(event.version == 1 for event in events)
+    with engine.connect() as conn:
+        indexed = conn.exec_driver_sql(
+            "SELECT rowid FROM events_fts WHERE events_fts MATCH 'older'"
+        ).all()
+    assert len(indexed) == 1
+    engine.dispose()
+
+
+def feed_summaries(response):
+    calendar = Calendar.from_ical(response.content)
+    return sorted(str(event.get("summary")) for event in calendar.walk("VEVENT"))
+
+
+@pytest.fixture
+def filter_events(session_factory):
+    add_events(
+        session_factory,
+        sample_event("Jazz Night", tags="music,jazz", venue="Blue Room"),
+        sample_event("Rock Show", tags="music,rock-n-roll", venue="Main Hall"),
+        sample_event(
+            "Harvest Fair",
+            tags="family,outdoor",
+            venue="Main Hall",
+            start_time=datetime(2025, 9, 20, 10, 0, 0),
+            end_time=datetime(2025, 9, 20, 16, 0, 0),
+        ),
+        sample_event(
+            "Late Party",
+            tags="music",
+            venue="Blue Room",
+            start_time=datetime(2025, 12, 31, 22, 0, 0),
+            end_time=datetime(2026, 1, 1, 2, 0, 0),
+        ),
+    )
+
+
+def test_get_calendar_filtered_by_tag(client, filter_events):
+    response = client.get("/events.ics", params={"tag": "music"})
+
+    assert response.status_code == 200
+    assert feed_summaries(response) == ["Jazz Night", "Late Party", "Rock Show"]
+
+
+def test_get_calendar_tag_filter_matches_whole_tags(client, filter_events):
+    assert feed_summaries(client.get("/events.ics", params={"tag": "rock"})) == []
+    assert feed_summaries(client.get("/events.ics", params={"tag": "%"})) == []
+
+
+def test_get_calendar_filtered_by_venue(client, filter_events):
+    response = client.get("/events.ics", params={"venue": "Main Hall"})
+
+    assert feed_summaries(response) == ["Harvest Fair", "Rock Show"]
+
+
+def test_get_calendar_filtered_by_date_window(client, filter_events):
+    response = client.get(
+        "/events.ics", params={"from": "2025-08-01", "to": "2025-12-31T23:00:00"}
+    )
+
+    assert feed_summaries(response) == ["Harvest Fair", "Late Party"]
+
+
+def test_get_calendar_window_includes_overlapping_events(client, filter_events):
+    response = client.get("/events.ics", params={"from": "2026-01-01T01:00:00"})
+
+    assert feed_summaries(response) == ["Late Party"]
+
+
+def test_get_calendar_combined_filters(client, filter_events):
+    response = client.get(
+        "/events.ics",
+        params={"tag": "music", "venue": "Blue Room", "to": "2025-08-01"},
+    )
+
+    assert feed_summaries(response) == ["Jazz Night"]
+
+
+def test_get_calendar_filter_variants_have_own_etag_and_cache(client, filter_events):
+    full = client.get("/events.ics")
+    music = client.get("/events.ics", params={"tag": "music"})
+
+    assert full.headers["ETag"] != music.headers["ETag"]
+
+    response = client.get(
+        "/events.ics",
+        params={"tag": "music"},
+        headers={"If-None-Match": full.headers["ETag"]},
+    )
+    assert response.status_code == 200
+
+    with patch("app.routers.calendar._build_calendar") as build_calendar:
+        cached = client.get("/events.ics", params={"tag": "music"})
+    build_calendar.assert_not_called()
+    assert cached.content == music.content
+
+
+def test_feed_cache_evicts_least_recently_used_variant():
+    cache = FeedCache(max_entries=2)
+    cache.set("a", FeedSnapshot('"a"', None, b"a"))
+    cache.set("b", FeedSnapshot('"b"', None, b"b"))
+    assert cache.get("a", '"a"') is not None
+
+    cache.set("c", FeedSnapshot('"c"', None, b"c"))
+
+    assert cache.get("a", '"a"') is not None
+    assert cache.get("b", '"b"') is None
+    assert cache.get("c", '"c"') is not None
+
+
+def test_feed_cache_build_failure_reaches_waiters_and_is_retried():
+    cache = FeedCache(max_entries=2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build("a", '"a"', fail)
+
+    snapshot = cache.get_or_build("a", '"a"', lambda: FeedSnapshot('"a"', None, b"a"))
+    assert snapshot.body == b"a"
+
+
+def test_concurrent_calendar_requests_share_one_build(client, session_factory):
+    add_events(session_factory, sample_event("Popular Event"))
+    requests = 8
+    barrier = threading.Barrier(requests)
+    build_calendar = calendar_router._build_calendar
+
+    def slow_build_calendar(db, filters):
+        time.sleep(0.2)
+        return build_calendar(db, filters)
+
+    def fetch(_):
+        barrier.wait()
+        return client.get("/events.ics")
+
+    with patch(
+        "app.routers.calendar._build_calendar", side_effect=slow_build_calendar
+    ) as build:
+        with ThreadPoolExecutor(max_workers=requests) as pool:
+            responses = list(pool.map(fetch, range(requests)))
+
+    build.assert_called_once()
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.content for response in responses}) == 1
+    assert "SUMMARY:Popular Event" in responses[0].text
+
+
+def test_calendar_serves_stale_feed_while_rebuilding(
+    client, auth_headers, session_factory
+):
+    add_events(session_factory, sample_event("Old Event"))
+    first = client.get("/events.ics")
+    add_events(session_factory, sample_event("New Event"))
+    rebuild_started = threading.Event()
+    release_rebuild = threading.Event()
+    build_calendar = calendar_router._build_calendar
+
+    def blocked_build_calendar(db, filters):
+        rebuild_started.set()
+        release_rebuild.wait(5)
+        return build_calendar(db, filters)
+
+    with (
+        patch.object(calendar_router.settings, "feed_stale_while_revalidate", True),
+        patch("app.routers.calendar._build_calendar", blocked_build_calendar),
+    ):
+        stale = client.get("/events.ics")
+        assert rebuild_started.wait(5)
+        revalidated = client.get(
+            "/events.ics", headers={"If-None-Match": first.headers["ETag"]}
+        )
+        release_rebuild.set()
+        feed_cache.wait_for_builds()
+        fresh = client.get("/events.ics")
+
+    assert stale.status_code == 200
+    assert stale.content == first.content
+    assert stale.headers["ETag"] == first.headers["ETag"]
+    assert revalidated.status_code == 304
+    assert "SUMMARY:New Event" in fresh.text
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+
+
+def test_fragment_cache_respects_byte_budget():
+    cache = FragmentCache(max_bytes=10)
+    cache.set(1, "v1", b"aaaa")
+    cache.set(2, "v1", b"bbbb")
+    assert cache.get(1, "v1") == b"aaaa"
+
+    cache.set(3, "v1", b"cccc")
+
+    assert cache.get(1, "v1") == b"aaaa"
+    assert cache.get(2, "v1") is None
+    assert cache.size == 8
+
+    cache.set(1, "v2", b"a")
+    assert cache.get(1, "v1") is None
+    assert cache.get(1, "v2") == b"a"
+    assert cache.size == 5
+
+    cache.set(4, "v1", b"x" * 11)
+    assert cache.get(4, "v1") is None
+
+
+def test_feed_rebuild_only_renders_changed_events(client, session_factory):
+    events = [sample_event(f"Event {index}") for index in range(5)]
+    add_events(session_factory, *events)
+    client.get("/events.ics")
+
+    with session_factory() as db:
+        edited = db.get(Event, events[2].id)
+        edited.title = "Edited Event"
+        db.commit()
+        assert edited.version == 2
+        bump_calendar_version(db)
+        db.commit()
+
+    with patch(
+        "app.routers.calendar.render_event", wraps=calendar_router.render_event
+    ) as render_event:
         response = client.get("/events.ics")
 
+    assert render_event.call_count == 1
+    assert "SUMMARY:Edited Event" in response.text
+    assert response.text.count("BEGIN:VEVENT") == 5
+
+
+def test_fragment_cache_ignores_reused_event_ids(client, auth_headers, session_factory):
+    event = sample_event("Deleted Event")
+    add_events(session_factory, event)
+    event_id = event.id
+    client.get("/events.ics")
+    client.delete(f"/events/{event_id}", headers=auth_headers)
+
+    replacement = sample_event("Replacement Event")
+    add_events(session_factory, replacement)
+    assert replacement.id == event_id
+
+    feed = client.get("/events.ics").text
+    assert "SUMMARY:Replacement Event" in feed
+    assert "Deleted Event" not in feed
+
+
+def test_get_events_paginates_with_cursor(client, auth_headers, session_factory):
+    add_events(
+        session_factory,
+        *[
+            sample_event(
+                f"Event {index}",
+                start_time=datetime(2025, 7, 1 + index // 2, 19, 0, 0),
+                end_time=datetime(2025, 7, 1 + index // 2, 21, 0, 0),
+            )
+            for index in range(7)
+        ],
+    )
+
+    titles = []
+    params = {"limit": 3}
+    pages = 0
+    while True:
+        response = client.get("/events", params=params, headers=auth_headers)
         assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 3
+        titles.extend(event["title"] for event in page)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            break
+        assert f"after={cursor}" in response.headers["Link"]
+        params = {"limit": 3, "after": cursor}
+
+    assert pages == 3
+    assert titles == [f"Event {index}" for index in range(7)]
+
+
+def test_get_events_orders_by_start_time(client, auth_headers, session_factory):
+    add_events(
+        session_factory,
+        sample_event("Later", start_time=datetime(2025, 8, 1, 19, 0, 0)),
+        sample_event("Earlier", start_time=datetime(2025, 6, 1, 19, 0, 0)),
+    )
+
+    response = client.get("/events", headers=auth_headers)
+
+    assert [event["title"] for event in response.json()] == ["Earlier", "Later"]
+    assert "X-Next-Cursor" not in response.headers
 
-        calendar = Calendar.from_ical(response.content)
-        assert calendar is not None
 
-        events = [
-            component for component in calendar.walk() if component.name == "VEVENT"
+def test_get_events_serializes_rows_like_the_orm(client, auth_headers, session_factory):
+    event = sample_event("Row Event", tags="music,outdoor")
+    add_events(session_factory, event)
+
+    (payload,) = client.get("/events", headers=auth_headers).json()
+
+    assert payload == jsonable_encoder(event)
+    assert payload["start_time"] == "2025-07-01T19:00:00"
+    assert payload["tags"] == "music,outdoor"
+
+
+def test_get_events_time_window(client, auth_headers, filter_events):
+    response = client.get(
+        "/events",
+        params={"from": "2025-08-01", "to": "2025-12-01"},
+        headers=auth_headers,
+    )
+
+    assert [event["title"] for event in response.json()] == ["Harvest Fair"]
+
+
+@pytest.mark.parametrize(
+    "position",
+    [
+        None,
+        '["2025-01-01", 99999999999999999999999]',
+        '["2025-01-01", 1, 2]',
+        '"ab"',
+    ],
+    ids=["garbage", "id-overflow", "three-elements", "string"],
+)
+def test_get_events_invalid_cursor(client, auth_headers, session_factory, position):
+    cursor = (
+        "not-a-cursor"
+        if position is None
+        else base64.urlsafe_b64encode(position.encode()).decode()
+    )
+    response = client.get("/events", params={"after": cursor}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_get_events_limit_bounds(client, auth_headers, session_factory):
+    assert (
+        client.get("/events", params={"limit": 0}, headers=auth_headers).status_code
+        == 422
+    )
+    assert (
+        client.get("/events", params={"limit": 1001}, headers=auth_headers).status_code
+        == 422
+    )
+
+
+def import_payload(title, **overrides):
+    payload = {
+        "title": title,
+        "start_time": "2025-07-01T19:00:00",
+        "end_time": "2025-07-01T21:00:00",
+        "description": "Imported event",
+        "venue": "Import Hall",
+        "tags": ["imported"],
+    }
+    payload.update(overrides)
+    return payload
+
+
+def stored_titles(session_factory):
+    with session_factory() as db:
+        return sorted(db.scalars(select(Event.title)).all())
+
+
+def test_import_events_json_array(client, auth_headers, session_factory):
+    payloads = [
+        import_payload("First"),
+        import_payload(""),
+        import_payload("Second", tags=["a", "b"]),
+    ]
+
+    response = client.post("/events/import", json=payloads, headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert result["errors"][0]["errors"][0]["loc"] == ["title"]
+    assert stored_titles(session_factory) == ["First", "Second"]
+
+    feed = client.get("/events.ics").text
+    assert "SUMMARY:First" in feed
+    assert "SUMMARY:Second" in feed
+
+
+def test_import_events_ndjson(client, auth_headers, session_factory):
+    lines = [
+        json.dumps(import_payload("One")),
+        "",
+        "{not json",
+        json.dumps(import_payload("Two", start_time="yesterday")),
+        json.dumps(import_payload("Three")),
+    ]
+
+    response = client.post(
+        "/events/import",
+        content="\n".join(lines).encode(),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert [error["index"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["errors"][0]["type"] == "json_invalid"
+    assert stored_titles(session_factory) == ["One", "Three"]
+
+
+def test_import_events_in_batches(client, auth_headers, session_factory):
+    payloads = [import_payload(f"Event {index:02d}") for index in range(25)]
+
+    with (
+        patch.object(calendar_router.settings, "import_batch_size", 10),
+        patch(
+            "app.importer.EventImporter.flush",
+            autospec=True,
+            side_effect=EventImporter.flush,
+        ) as flush,
+    ):
+        response = client.post("/events/import", json=payloads, headers=auth_headers)
+
+    assert response.json() == {"imported": 25, "unchanged": 0, "errors": []}
+    assert flush.call_count == 3
+    assert len(stored_titles(session_factory)) == 25
+    with session_factory() as db:
+        uids = db.scalars(select(Event.uid)).all()
+    assert len(set(uids)) == 25
+
+
+def test_import_events_bumps_feed_version(client, auth_headers, session_factory):
+    etag = client.get("/events.ics").headers["ETag"]
+
+    client.post("/events/import", json=[import_payload("New")], headers=auth_headers)
+
+    assert client.get("/events.ics").headers["ETag"] != etag
+
+
+def test_import_events_rejects_non_array(client, auth_headers, session_factory):
+    response = client.post(
+        "/events/import", json=import_payload("Single"), headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    response = client.post("/events/import", content=b"[{", headers=auth_headers)
+    assert response.status_code == 400
+    assert stored_titles(session_factory) == []
+
+
+def test_import_events_unauthenticated(client):
+    response = client.post("/events/import", json=[import_payload("Nope")])
+
+    assert response.status_code == 401
+
+
+def ics_feed(*vevents):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Other Tool//EN"]
+    for vevent in vevents:
+        lines += ["BEGIN:VEVENT", *vevent, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def import_ics(client, auth_headers, body):
+    return client.post(
+        "/events/import",
+        content=body,
+        headers={**auth_headers, "Content-Type": "text/calendar; charset=utf-8"},
+    )
+
+
+CONCERT = [
+    "UID:concert@other.example",
+    "SUMMARY:Summer Concert\\, Part 1",
+    "DTSTART;TZID=Europe/Berlin:20250701T190000",
+    "DURATION:PT2H30M",
+    "DESCRIPTION:Bring a chair;",
+    " and a friend",
+    "LOCATION:Park & Lawn",
+    "CATEGORIES:music,outdoor",
+    "CATEGORIES:family",
+    "LAST-MODIFIED:20250601T120000Z",
+]
+MARKET = [
+    "UID:market@other.example",
+    "SUMMARY:Market",
+    "DTSTART;VALUE=DATE:20250705",
+    "DESCRIPTION:Local produce",
+    "LOCATION:Town Square",
+]
+# DESCRIPTION and LOCATION are required, as on every other write path.
+DETAILS = ["DESCRIPTION:Details to follow", "LOCATION:Town Hall"]
+
+
+def test_import_ics_maps_vevent_properties(client, auth_headers, session_factory):
+    response = import_ics(client, auth_headers, ics_feed(CONCERT, MARKET))
+
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2, "unchanged": 0, "errors": []}
+    with session_factory() as db:
+        concert = db.scalars(
+            select(Event).where(Event.uid == "concert@other.example")
+        ).one()
+        market = db.scalars(
+            select(Event).where(Event.uid == "market@other.example")
+        ).one()
+
+    assert concert.title == "Summer Concert, Part 1"
+    assert concert.start_time == datetime(2025, 7, 1, 17, 0, 0)
+    assert concert.end_time == datetime(2025, 7, 1, 19, 30, 0)
+    assert concert.description == "Bring a chair;and a friend"
+    assert concert.venue == "Park &amp; Lawn"
+    assert concert.get_tags_list() == ["music", "outdoor", "family"]
+    assert concert.last_modified == datetime(2025, 6, 1, 12, 0, 0)
+    assert market.end_time == datetime(2025, 7, 6)
+    assert market.venue == "Town Square"
+
+    feed = client.get("/events.ics").text
+    assert "UID:concert@other.example" in feed
+    assert "CATEGORIES:music,outdoor,family" in feed
+
+
+def test_import_ics_normalises_mixed_time_forms(client, auth_headers, session_factory):
+    berlin_until_utc = [
+        "UID:berlin@other.example",
+        "SUMMARY:Berlin",
+        "DTSTART;TZID=Europe/Berlin:20250701T190000",
+        "DTEND:20250701T190000Z",
+        *DETAILS,
+    ]
+    utc_until_floating = [
+        "UID:utc@other.example",
+        "SUMMARY:UTC",
+        "DTSTART:20250701T170000Z",
+        "DTEND:20250701T210000",
+        *DETAILS,
+    ]
+    date_until_utc = [
+        "UID:date@other.example",
+        "SUMMARY:Date",
+        "DTSTART;VALUE=DATE:20250701",
+        "DTEND:20250702T120000Z",
+        *DETAILS,
+    ]
+
+    with patch.object(calendar_router.settings, "import_timezone", "Europe/Berlin"):
+        response = import_ics(
+            client,
+            auth_headers,
+            ics_feed(berlin_until_utc, utc_until_floating, date_until_utc),
+        )
+
+    assert response.json() == {"imported": 3, "unchanged": 0, "errors": []}
+    with session_factory() as db:
+        times = {
+            title: (start, end)
+            for title, start, end in db.execute(
+                select(Event.title, Event.start_time, Event.end_time)
+            )
+        }
+    assert times == {
+        "Berlin": (datetime(2025, 7, 1, 19), datetime(2025, 7, 1, 21)),
+        "UTC": (datetime(2025, 7, 1, 19), datetime(2025, 7, 1, 21)),
+        "Date": (datetime(2025, 7, 1), datetime(2025, 7, 2, 14)),
+    }
+
+
+def test_import_ics_round_trips_own_feed(client, auth_headers, session_factory):
+    client.post(
+        "/add-event",
+        json={
+            "title": "Rock & Roll",
+            "start_time": "2025-07-01T19:00:00",
+            "end_time": "2025-07-01T21:00:00",
+            "description": "Fish & Chips",
+            "venue": "Park & Lawn",
+            "tags": ["r&b"],
+        },
+        headers=auth_headers,
+    )
+    with session_factory() as db:
+        before = db.execute(
+            select(Event.title, Event.description, Event.venue, Event.tags)
+        ).one()
+
+    response = import_ics(client, auth_headers, client.get("/events.ics").content)
+
+    assert response.json() == {"imported": 0, "unchanged": 1, "errors": []}
+    with session_factory() as db:
+        after = db.execute(
+            select(Event.title, Event.description, Event.venue, Event.tags)
+        ).one()
+    assert after == before
+    assert after.title == "Rock &amp; Roll"
+
+
+def test_import_ics_unsupported_database(client, auth_headers, session_factory):
+    with patch.object(
+        calendar_router, "SUPPORTED_UPSERT_DIALECTS", frozenset({"postgresql"})
+    ):
+        response = import_ics(client, auth_headers, ics_feed(MARKET))
+
+    assert response.status_code == 501
+    assert stored_titles(session_factory) == []
+
+
+def test_import_ics_upserts_by_uid(client, auth_headers, session_factory):
+    import_ics(client, auth_headers, ics_feed(CONCERT, MARKET))
+    etag = client.get("/events.ics").headers["ETag"]
+
+    response = import_ics(client, auth_headers, ics_feed(CONCERT, MARKET))
+    assert response.json() == {"imported": 0, "unchanged": 2, "errors": []}
+    assert client.get("/events.ics").headers["ETag"] == etag
+
+    renamed = [*MARKET[:1], "SUMMARY:Night Market", *MARKET[2:]]
+    fair = [
+        "UID:fair@other.example",
+        "SUMMARY:Fair",
+        "DTSTART:20250801T100000Z",
+        *DETAILS,
+    ]
+    response = import_ics(client, auth_headers, ics_feed(CONCERT, renamed, fair))
+
+    assert response.json() == {"imported": 2, "unchanged": 1, "errors": []}
+    assert client.get("/events.ics").headers["ETag"] != etag
+    assert stored_titles(session_factory) == [
+        "Fair",
+        "Night Market",
+        "Summer Concert, Part 1",
+    ]
+    with session_factory() as db:
+        versions = dict(db.execute(select(Event.title, Event.version)).tuples().all())
+    assert versions == {"Fair": 1, "Night Market": 2, "Summer Concert, Part 1": 1}
+
+
+def test_import_ics_commits_in_batches(client, auth_headers, session_factory):
+    vevents = [
+        [
+            f"UID:event-{index}",
+            f"SUMMARY:Event {index}",
+            "DTSTART:20250701T190000",
+            *DETAILS,
         ]
-        assert len(events) == 1
+        for index in range(5)
+    ]
 
-        event = events[0]
-        assert event.get("summary") == "Test Event"
-        assert event.get("location") == "Test Venue"
-        assert event.get("description") == "A test event for the calendar"
-    finally:
-        app.dependency_overrides.clear()
+    with (
+        patch.object(calendar_router.settings, "import_batch_size", 2),
+        patch(
+            "app.importer.bump_calendar_version", wraps=bump_calendar_version
+        ) as bump,
+    ):
+        response = import_ics(client, auth_headers, ics_feed(*vevents))
+
+    assert response.json()["imported"] == 5
+    assert bump.call_count == 3
+
+
+def test_import_ics_reports_invalid_events(client, auth_headers, session_factory):
+    missing_start = ["UID:broken@other.example", "SUMMARY:Broken"]
+    backwards = [
+        "UID:backwards@other.example",
+        "SUMMARY:Backwards",
+        "DTSTART:20250701T190000",
+        "DTEND:20250701T180000",
+        *DETAILS,
+    ]
 
+    response = import_ics(
+        client, auth_headers, ics_feed(missing_start, MARKET, backwards)
+    )
 
-def test_get_calendar_database_error_handled_gracefully(client):
-    mock_db_session = Mock()
-    mock_db_session.query.side_effect = Exception("Database connection error")
+    result = response.json()
+    assert result["imported"] == 1
+    assert [error["index"] for error in result["errors"]] == [0, 2]
+    assert "DTSTART" in result["errors"][0]["errors"][0]["msg"]
 
-    def override_get_db():
-        return mock_db_session
 
-    app.dependency_overrides[get_db] = override_get_db
+def test_import_ics_rejects_empty_uid(client, auth_headers, session_factory):
+    first = ["UID:", "SUMMARY:First", "DTSTART:20250701T190000", *DETAILS]
+    second = ["UID:  ", "SUMMARY:Second", "DTSTART:20250702T190000", *DETAILS]
 
-    try:
-        response = client.get("/events.ics")
-        assert response.status_code in [200, 500]
-    except Exception:
-        pass
-    finally:
-        app.dependency_overrides.clear()
+    response = import_ics(client, auth_headers, ics_feed(first, second))
+
+    result = response.json()
+    assert result["imported"] == 0
+    assert [error["errors"][0]["msg"] for error in result["errors"]] == [
+        "UID is empty",
+        "UID is empty",
+    ]
+    assert stored_titles(session_factory) == []
+
+
+def test_import_ics_applies_event_limits(client, auth_headers, session_factory):
+    long_title = [
+        "UID:long@other.example",
+        "SUMMARY:" + "x" * 201,
+        "DTSTART:20250701T190000",
+        *DETAILS,
+    ]
+    no_location = [
+        "UID:nowhere@other.example",
+        "SUMMARY:Nowhere",
+        "DTSTART:20250701T190000",
+        "DESCRIPTION:Somewhere else",
+    ]
+    long_url = [*MARKET[:1], "SUMMARY:Linked", *MARKET[2:], "URL:" + "u" * 501]
+
+    response = import_ics(
+        client, auth_headers, ics_feed(long_title, no_location, long_url, CONCERT)
+    )
+
+    result = response.json()
+    assert result["imported"] == 1
+    assert [
+        (error["index"], [item["loc"] for item in error["errors"]])
+        for error in result["errors"]
+    ] == [(0, [["title"]]), (1, [["venue"]]), (2, [["url"]])]
+    assert stored_titles(session_factory) == ["Summer Concert, Part 1"]
+
+
+def test_import_ics_rejects_malformed_lines(client, auth_headers, session_factory):
+    body = ics_feed(["UID:x", "garbage without a colon"])
+
+    response = import_ics(client, auth_headers, body)
+
+    assert response.status_code == 400
+    assert "Line" in response.json()["detail"]
+
+
+@pytest.fixture
+def search_events(session_factory):
+    add_events(
+        session_factory,
+        sample_event("Jazz Night", description="Live quartet", venue="Blue Room"),
+        sample_event("Open Mic", description="Bring your jazz standards"),
+        sample_event("Café Concert", description="Strings", venue="Jazzhaus"),
+        sample_event(
+            "Jazz Brunch",
+            start_time=datetime(2025, 9, 20, 10, 0, 0),
+            end_time=datetime(2025, 9, 20, 12, 0, 0),
+        ),
+    )
+
+
+def search(client, auth_headers, **params):
+    response = client.get("/events/search", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return [event["title"] for event in response.json()]
+
+
+def test_search_ranks_title_matches_first(client, auth_headers, search_events):
+    titles = search(client, auth_headers, q="jazz")
+
+    assert set(titles[:2]) == {"Jazz Night", "Jazz Brunch"}
+    assert titles[2:] == ["Café Concert", "Open Mic"]
+
+
+def test_search_prefix_and_diacritics(client, auth_headers, search_events):
+    assert search(client, auth_headers, q="quar") == ["Jazz Night"]
+    assert search(client, auth_headers, q="cafe") == ["Café Concert"]
+    assert search(client, auth_headers, q="jazz night") == ["Jazz Night"]
+
+
+def test_search_ignores_query_syntax(client, auth_headers, search_events):
+    assert search(client, auth_headers, q='"jazz*" (-') != []
+    assert search(client, auth_headers, q="*:()") == []
+
+
+def test_search_time_window(client, auth_headers, search_events):
+    titles = search(client, auth_headers, q="jazz", **{"from": "2025-09-01"})
+
+    assert titles == ["Jazz Brunch"]
+
+
+def test_search_paginates(client, auth_headers, search_events):
+    response = client.get(
+        "/events/search", params={"q": "jazz", "limit": 3}, headers=auth_headers
+    )
+    assert len(response.json()) == 3
+    assert "offset=3" in response.headers["Link"]
+
+    rest = search(client, auth_headers, q="jazz", limit=3, offset=3)
+    assert rest == ["Open Mic"]
+
+
+def test_search_follows_updates_and_deletes(
+    client, auth_headers, session_factory, search_events
+):
+    with session_factory() as db:
+        event = db.scalars(select(Event).where(Event.title == "Open Mic")).one()
+        event.title = "Poetry Slam"
+        event.description = "Spoken word"
+        db.commit()
+        db.delete(db.scalars(select(Event).where(Event.title == "Jazz Night")).one())
+        db.commit()
+
+    assert search(client, auth_headers, q="jazz") == ["Jazz Brunch", "Café Concert"]
+    assert search(client, auth_headers, q="poetry") == ["Poetry Slam"]
+
+
+def test_search_rebuild(client, auth_headers, session_factory, search_events):
+    with session_factory() as db:
+        db.execute(text("INSERT INTO events_fts(events_fts) VALUES ('delete-all')"))
+        db.commit()
+    assert search(client, auth_headers, q="jazz") == []
+
+    response = client.post("/search/rebuild", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(search(client, auth_headers, q="jazz")) == 4
+
+
+def test_search_unauthenticated(client):
+    assert client.get("/events/search", params={"q": "jazz"}).status_code == 401
+    assert client.post("/search/rebuild").status_code == 401
+
+
+def tag_facets(client, **params):
+    response = client.get("/tags", params=params)
+    assert response.status_code == 200
+    return {facet["tag"]: facet["count"] for facet in response.json()}
+
+
+def test_tag_facets(client, filter_events):
+    response = client.get("/tags")
+
+    assert response.json()[0] == {"tag": "music", "count": 3}
+    assert tag_facets(client) == {
+        "music": 3,
+        "family": 1,
+        "jazz": 1,
+        "outdoor": 1,
+        "rock-n-roll": 1,
+    }
+    assert tag_facets(client, venue="Main Hall") == {
+        "family": 1,
+        "music": 1,
+        "outdoor": 1,
+        "rock-n-roll": 1,
+    }
+    assert tag_facets(client, **{"from": "2025-09-01"}) == {
+        "family": 1,
+        "music": 1,
+        "outdoor": 1,
+    }
+
+
+def test_get_events_filtered_by_tag(client, auth_headers, filter_events):
+    response = client.get("/events", params={"tag": "music"}, headers=auth_headers)
+
+    assert [event["title"] for event in response.json()] == [
+        "Jazz Night",
+        "Rock Show",
+        "Late Party",
+    ]
+
+
+def test_tag_index_follows_event_writes(
+    client, auth_headers, session_factory, filter_events
+):
+    with session_factory() as db:
+        jazz = db.scalars(select(Event).where(Event.title == "Jazz Night")).one()
+        jazz.set_tags_list(["jazz", "late"])
+        db.commit()
+        rock = db.scalars(select(Event).where(Event.title == "Rock Show")).one()
+        rock_id = rock.id
+
+    client.delete(f"/events/{rock_id}", headers=auth_headers)
+    client.post(
+        "/add-event",
+        json={**import_payload("Added"), "tags": ["late", "music"]},
+        headers=auth_headers,
+    )
+
+    assert tag_facets(client) == {
+        "late": 2,
+        "music": 2,
+        "family": 1,
+        "jazz": 1,
+        "outdoor": 1,
+    }
+
+
+def test_imports_populate_tag_index(client, auth_headers, session_factory):
+    client.post(
+        "/events/import",
+        json=[import_payload("A", tags=["x", "y"]), import_payload("B", tags=["y"])],
+        headers=auth_headers,
+    )
+    import_ics(client, auth_headers, ics_feed(CONCERT))
+    assert tag_facets(client) == {
+        "y": 2,
+        "family": 1,
+        "music": 1,
+        "outdoor": 1,
+        "x": 1,
+    }
+
+    retagged = [line for line in CONCERT if not line.startswith("CATEGORIES")]
+    import_ics(client, auth_headers, ics_feed([*retagged, "CATEGORIES:y"]))
+
+    assert tag_facets(client) == {"y": 3, "x": 1}
+
+
+def test_cleanup_removes_tag_links(client, auth_headers, session_factory):
+    add_events(
+        session_factory,
+        sample_event(
+            "Old",
+            tags="vintage",
+            start_time=datetime(2020, 1, 1, 19, 0, 0),
+            end_time=datetime(2020, 1, 1, 21, 0, 0),
+        ),
+    )
+    assert tag_facets(client) == {"vintage": 1}
+
+    client.post("/cleanup", headers=auth_headers)
+
+    assert tag_facets(client) == {}
+
+
+def test_get_calendar_serves_precompressed_gzip(client, session_factory):
+    add_events(session_factory, *(sample_event(f"Event {i}") for i in range(20)))
+
+    with patch(
+        "app.routers.calendar.compress_variants",
+        wraps=calendar_router.compress_variants,
+    ) as compress_variants:
+        gzipped = client.get("/events.ics", headers={"Accept-Encoding": "gzip"})
+        again = client.get("/events.ics", headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/events.ics", headers={"Accept-Encoding": "identity"})
+
+    compress_variants.assert_called_once()
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["Vary"] == "Accept-Encoding"
+    assert int(gzipped.headers["Content-Length"]) < len(identity.content) / 4
+    assert gzipped.content == again.content == identity.content
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["Vary"] == "Accept-Encoding"
+    assert gzipped.headers["ETag"] != identity.headers["ETag"]
+    assert gzipped.headers["ETag"].endswith('-gzip"')
+
+
+def test_get_calendar_304_matches_encoded_variant(client, session_factory):
+    gzipped = client.get("/events.ics", headers={"Accept-Encoding": "gzip"})
+    etag = gzipped.headers["ETag"]
+
+    not_modified = client.get(
+        "/events.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    other_variant = client.get(
+        "/events.ics", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["Vary"] == "Accept-Encoding"
+    assert other_variant.status_code == 200
+
+
+def test_get_events_compresses_large_pages(client, auth_headers, session_factory):
+    add_events(session_factory, *(sample_event(f"Event {i}") for i in range(20)))
+
+    gzipped = client.get("/events", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    identity = client.get(
+        "/events", headers={**auth_headers, "Accept-Encoding": "identity"}
+    )
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in identity.headers
+    assert gzipped.json() == identity.json()
+    assert len(identity.json()) == 20
+
+
+def test_slow_calendar_build_does_not_block_other_requests(
+    auth_headers, session_factory
+):
+    add_events(session_factory, sample_event())
+    build_started = threading.Event()
+    build_calendar = calendar_router._build_calendar
+
+    def slow_build_calendar(db, filters):
+        build_started.set()
+        time.sleep(0.5)
+        return build_calendar(db, filters)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as http:
+            calendar_request = asyncio.create_task(http.get("/events.ics"))
+            assert await asyncio.to_thread(build_started.wait, 5)
+
+            started = time.perf_counter()
+            events_response = await http.get("/events", headers=auth_headers)
+            elapsed = time.perf_counter() - started
+
+            assert not calendar_request.done()
+            calendar_response = await calendar_request
+        return events_response, calendar_response, elapsed
+
+    with patch("app.routers.calendar._build_calendar", side_effect=slow_build_calendar):
+        events_response, calendar_response, elapsed = asyncio.run(scenario())
+
+    assert events_response.status_code == 200
+    assert calendar_response.status_code == 200
+    assert elapsed < 0.4
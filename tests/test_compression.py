@@ -0,0 +1,65 @@
+import gzip
+
+import pytest
+
+from app.compression import (
+    MIN_COMPRESS_BYTES,
+    compress,
+    encode_response_body,
+    negotiate_encoding,
+    variant_etag,
+)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0.1, gzip;q=0.5", "gzip"),
+        ("GZIP;Q=1.0", "gzip"),
+        ("gzip;q=invalid", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ("br", "gzip")) == expected
+
+
+def test_negotiate_encoding_only_offers_available_codings():
+    assert negotiate_encoding("br", ("gzip",)) is None
+    assert negotiate_encoding("br, gzip;q=0.5", ("gzip",)) == "gzip"
+
+
+def test_gzip_output_is_deterministic():
+    body = b"BEGIN:VCALENDAR\r\n" * 100
+
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip("brotli")
+    body = b"BEGIN:VCALENDAR\r\n" * 100
+
+    assert brotli.decompress(compress(body, "br")) == body
+
+
+def test_variant_etag():
+    assert variant_etag('"abc"', None) == '"abc"'
+    assert variant_etag('"abc"', "gzip") == '"abc-gzip"'
+
+
+def test_encode_response_body_skips_small_bodies():
+    small = b"x" * (MIN_COMPRESS_BYTES - 1)
+    large = b"x" * MIN_COMPRESS_BYTES
+
+    assert encode_response_body(small, "gzip") == (small, {"Vary": "Accept-Encoding"})
+    body, headers = encode_response_body(large, "gzip")
+    assert headers == {"Vary": "Accept-Encoding", "Content-Encoding": "gzip"}
+    assert gzip.decompress(body) == large
@@ -0,0 +1,300 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from icalendar import Calendar, Event as ICalEvent
+
+from app.ics import (
+    CALENDAR_FOOTER,
+    VEventReader,
+    calendar_header,
+    format_datetime,
+    parse_content_line,
+    parse_datetime,
+    parse_duration,
+    render_event,
+    split_text_list,
+    unescape_text,
+)
+from app.models import Event
+
+CREATED = datetime(2025, 6, 1, 9, 30, 0)
+LAST_MODIFIED = datetime(2025, 6, 28, 12, 0, 0)
+
+
+def make_event(**overrides):
+    fields = {
+        "title": "Test Event",
+        "start_time": datetime(2025, 7, 1, 19, 0, 0),
+        "end_time": datetime(2025, 7, 1, 21, 0, 0),
+        "description": "A test event for the calendar",
+        "venue": "Test Venue",
+        "url": "https://example.com",
+        "uid": "3f2b8c1e-5d4a-4e6b-9c7d-0a1b2c3d4e5f",
+        "created": CREATED,
+        "last_modified": LAST_MODIFIED,
+    }
+    fields.update(overrides)
+    return Event(**fields)
+
+
+def reference_calendar(prodid):
+    cal = Calendar()
+    cal.add("prodid", prodid)
+    cal.add("version", "2.0")
+    cal.add("calscale", "GREGORIAN")
+    cal.add("method", "PUBLISH")
+    return cal
+
+
+def as_utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def reference_event(event):
+    ical_event = ICalEvent()
+    ical_event.add("uid", event.uid)
+    ical_event.add("dtstart", event.start_time)
+    ical_event.add("dtend", event.end_time)
+    ical_event.add("summary", event.title)
+    ical_event.add("description", event.description)
+    ical_event.add("location", event.venue)
+    ical_event.add("url", event.url)
+    ical_event.add("dtstamp", as_utc(event.last_modified))
+    ical_event.add("created", as_utc(event.created))
+    ical_event.add("last-modified", as_utc(event.last_modified))
+    if event.tags:
+        ical_event.add("categories", event.get_tags_list())
+    return ical_event
+
+
+EVENT_CASES = {
+    "plain": {},
+    "punctuation": {
+        "title": "Rock, Paper; Scissors \\ Lizard",
+        "venue": "Hall A; Room 2, Floor 3",
+    },
+    "newlines": {"description": "First line\nSecond line\r\nThird line"},
+    "html_escaped": {"title": "Tom &amp; Jerry &lt;live&gt;"},
+    "literal_backslash_n": {"description": "Path C:\\New\\Notes"},
+    "fold_boundary_74": {"description": "x" * (74 - len("DESCRIPTION:"))},
+    "fold_boundary_75": {"description": "x" * (75 - len("DESCRIPTION:"))},
+    "long_ascii": {"description": "Lorem ipsum dolor sit amet, " * 40},
+    "two_byte": {"title": "Café crème " * 12},
+    "three_byte": {"venue": "東京国際フォーラム" * 10},
+    "four_byte": {"description": "Party 🎉🎶 " * 20},
+    "mixed_width_boundary": {"title": "a" * 64 + "é" * 10},
+    "url_with_separators": {"url": "https://example.com/?a=1,2;b=\\3"},
+    "empty_url": {"url": ""},
+    "utc_times": {
+        "start_time": datetime(2025, 7, 1, 19, 0, 0, tzinfo=timezone.utc),
+        "end_time": datetime(2025, 7, 1, 21, 30, 15, tzinfo=timezone.utc),
+    },
+    "aware_bookkeeping": {
+        "created": datetime(2025, 6, 1, 11, 30, 0, tzinfo=timezone(timedelta(hours=2))),
+        "last_modified": datetime(2025, 6, 28, 12, 0, 0, tzinfo=timezone.utc),
+    },
+    "uid_with_separators": {"uid": "event,42;import@example.com"},
+    "tags": {"tags": "music,outdoor,family"},
+    "tags_with_separators": {"tags": "rock;pop,C:\\Music," + "long-tag-" * 10},
+}
+
+
+@pytest.mark.parametrize("overrides", EVENT_CASES.values(), ids=EVENT_CASES.keys())
+def test_render_event_matches_icalendar(overrides):
+    event = make_event(**overrides)
+
+    rendered = render_event(event)
+
+    assert rendered == reference_event(event).to_ical()
+
+
+@pytest.mark.parametrize(
+    "prodid",
+    [
+        "-//Community Events Calendar//EN",
+        "-//Acme, Inc.//Events; Calendar//EN",
+        "-//" + "Very Long Product Identifier " * 5 + "//EN",
+    ],
+)
+def test_calendar_header_matches_icalendar(prodid):
+    expected = reference_calendar(prodid).to_ical()
+
+    assert calendar_header(prodid) + CALENDAR_FOOTER == expected
+
+
+def test_full_calendar_matches_icalendar():
+    events = [make_event(**overrides) for overrides in EVENT_CASES.values()]
+    prodid = "-//Test Calendar//EN"
+
+    rendered = (
+        calendar_header(prodid)
+        + b"".join(render_event(event) for event in events)
+        + CALENDAR_FOOTER
+    )
+
+    reference = reference_calendar(prodid)
+    for event in events:
+        reference.add_component(reference_event(event))
+    assert rendered == reference.to_ical()
+
+    parsed_events = list(Calendar.from_ical(rendered).walk("VEVENT"))
+    reference_events = list(Calendar.from_ical(reference.to_ical()).walk("VEVENT"))
+    assert len(parsed_events) == len(events)
+    for parsed_event, reference_parsed in zip(parsed_events, reference_events):
+        assert dict(parsed_event) == dict(reference_parsed)
+        assert parsed_event.decoded("dtstart") == reference_parsed.decoded("dtstart")
+
+
+@pytest.mark.parametrize("overrides", EVENT_CASES.values(), ids=EVENT_CASES.keys())
+def test_rendered_lines_fit_in_75_octets(overrides):
+    rendered = render_event(make_event(**overrides))
+
+    for line in rendered.split(b"\r\n"):
+        assert len(line) <= 75
+
+
+def test_format_datetime_converts_aware_values_to_utc():
+    value = datetime(2025, 7, 1, 21, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    assert format_datetime(value) == "20250701T190000Z"
+    assert format_datetime(value.replace(tzinfo=None)) == "20250701T210000"
+
+
+def read_vevents(data, newline="\r\n"):
+    reader = VEventReader()
+    events = [reader.feed(line) for line in data.decode().split(newline)]
+    events.append(reader.close())
+    return [event for event in events if event is not None]
+
+
+def test_reader_matches_icalendar_parse():
+    events = [make_event(**overrides) for overrides in EVENT_CASES.values()]
+    rendered = (
+        calendar_header("-//Test Calendar//EN")
+        + b"".join(render_event(event) for event in events)
+        + CALENDAR_FOOTER
+    )
+
+    parsed = read_vevents(rendered)
+    reference = list(Calendar.from_ical(rendered).walk("VEVENT"))
+
+    assert len(parsed) == len(reference) == len(events)
+    for properties, reference_event in zip(parsed, reference):
+        values = {name: value for name, _, value in properties}
+        for name in ("SUMMARY", "DESCRIPTION", "LOCATION", "UID"):
+            assert unescape_text(values[name]) == str(reference_event[name])
+        assert values["URL"] == str(reference_event["URL"])
+        assert parse_datetime(values["DTSTART"], {}) == reference_event.decoded(
+            "dtstart"
+        )
+        if "CATEGORIES" in values:
+            assert split_text_list(values["CATEGORIES"]) == [
+                str(category) for category in reference_event["CATEGORIES"].cats
+            ]
+
+
+def test_reader_skips_nested_components_and_accepts_bare_newlines():
+    data = "\n".join(
+        [
+            "BEGIN:VCALENDAR",
+            "BEGIN:VTIMEZONE",
+            "TZID:Europe/Berlin",
+            "END:VTIMEZONE",
+            "BEGIN:VEVENT",
+            "UID:first",
+            "SUMMARY:Caf",
+            " é crème",
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            "SUMMARY:Reminder",
+            "END:VALARM",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            "UID:second",
+            "END:VEVENT",
+            "END:VCALENDAR",
+        ]
+    ).encode()
+
+    first, second = read_vevents(data, newline="\n")
+
+    assert first == [("UID", {}, "first"), ("SUMMARY", {}, "Café crème")]
+    assert second == [("UID", {}, "second")]
+
+
+def test_reader_reports_malformed_lines():
+    reader = VEventReader()
+    reader.feed("BEGIN:VEVENT")
+    reader.feed("NOT A CONTENT LINE")
+
+    with pytest.raises(ValueError, match="Line 2"):
+        reader.feed("END:VEVENT")
+
+
+def test_parse_content_line_with_quoted_parameters():
+    line = 'LOCATION;ALTREP="http://example.com/a;b:c";LANGUAGE=en:Hall: Room 2'
+
+    assert parse_content_line(line) == (
+        "LOCATION",
+        {"ALTREP": "http://example.com/a;b:c", "LANGUAGE": "en"},
+        "Hall: Room 2",
+    )
+
+
+def test_split_text_list_keeps_escaped_commas():
+    assert split_text_list(r"rock\, pop,jazz\;blues,C:\\") == [
+        "rock, pop",
+        "jazz;blues",
+        "C:\\",
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, params, expected",
+    [
+        ("20250701T190000", {}, datetime(2025, 7, 1, 19, 0, 0)),
+        (
+            "20250701T190000Z",
+            {},
+            datetime(2025, 7, 1, 19, 0, 0, tzinfo=timezone.utc),
+        ),
+        (
+            "20250701T190000",
+            {"TZID": "Europe/Berlin"},
+            datetime(2025, 7, 1, 19, 0, 0, tzinfo=ZoneInfo("Europe/Berlin")),
+        ),
+        (
+            "20250701T190000",
+            {"TZID": "W. Europe Standard Time"},
+            datetime(2025, 7, 1, 19, 0, 0),
+        ),
+        ("20250701", {"VALUE": "DATE"}, datetime(2025, 7, 1)),
+    ],
+)
+def test_parse_datetime(value, params, expected):
+    parsed = parse_datetime(value, params)
+
+    assert parsed == expected
+    assert parsed.tzinfo == expected.tzinfo
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("PT1H30M", timedelta(hours=1, minutes=30)),
+        ("P1W", timedelta(weeks=1)),
+        ("P1DT12H", timedelta(days=1, hours=12)),
+        ("-PT15M", timedelta(minutes=-15)),
+    ],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+@pytest.mark.parametrize("value", ["P", "PT", "1H", "PT1X"])
+def test_parse_duration_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
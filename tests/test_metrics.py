@@ -0,0 +1,90 @@
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.metrics import Counter, Histogram, Registry, instrument_engine, registry
+from app.models import Event
+
+
+def test_counter_renders_escaped_labels():
+    test_registry = Registry()
+    counter = test_registry.register(Counter("hits_total", "Hits.", ("path",)))
+
+    counter.inc(('say "hi"\\',))
+    counter.inc(('say "hi"\\',), amount=2)
+
+    assert test_registry.render() == (
+        "# HELP hits_total Hits.\n"
+        "# TYPE hits_total counter\n"
+        'hits_total{path="say \\"hi\\"\\\\"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    test_registry = Registry()
+    histogram = test_registry.register(Histogram("latency", "Latency.", (0.5, 2.0)))
+
+    for value in (0.25, 0.5, 1.0, 4.0):
+        histogram.observe(value)
+
+    assert test_registry.render().splitlines()[2:] == [
+        'latency_bucket{le="0.5"} 2',
+        'latency_bucket{le="2.0"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_sum 5.75",
+        "latency_count 4",
+    ]
+
+
+def test_metrics_endpoint_reports_routes_feed_builds_and_caches(
+    client, session_factory
+):
+    requests = metrics.http_requests.value(("GET", "/events.ics", "200"))
+    builds = metrics.ics_build_seconds.count()
+
+    assert client.get("/events.ics").status_code == 200
+    assert client.get("/events.ics").status_code == 200
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert metrics.http_requests.value(("GET", "/events.ics", "200")) == requests + 2
+    assert metrics.ics_build_seconds.count() == builds + 1
+    assert metrics.ics_body_bytes.count() == builds + 1
+    body = response.text
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/events.ics",le="+Inf"}'
+        in body
+    )
+    assert 'feed_cache_requests_total{result="hit"}' in body
+    assert 'feed_cache_requests_total{result="miss"}' in body
+    assert "# TYPE ics_build_duration_seconds histogram" in body
+
+
+def test_unmatched_paths_are_not_recorded(client):
+    client.get("/no-such-page")
+
+    assert "/no-such-page" not in registry.render()
+
+
+def test_pool_gauges_report_checked_out_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    collect = metrics.pool_collector({"test": engine}, "checkedout")
+
+    with engine.connect():
+        assert list(collect()) == [(("test",), 1)]
+    assert list(collect()) == [(("test",), 0)]
+    engine.dispose()
+
+
+def test_instrumented_engine_records_query_durations(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    Event.metadata.create_all(engine)
+    instrument_engine(engine, "test")
+    before = metrics.db_query_seconds.count(("test", "select"))
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT count(*) FROM events")).scalar()
+        conn.execute(text("SELECT 1")).scalar()
+
+    assert metrics.db_query_seconds.count(("test", "select")) == before + 2
+    engine.dispose()
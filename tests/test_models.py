@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+
+from app.models import (
+    CalendarState,
+    create_tables,
+    is_memory_database,
+    make_engine,
+    make_read_engine,
+)
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_make_engine_applies_sqlite_profile(tmp_path):
+    engine = make_engine(
+        f"sqlite:///{tmp_path / 'tuned.db'}",
+        {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "mmap_size": 1048576,
+            "cache_size": -2048,
+            "temp_store": "memory",
+            "busy_timeout": 1234,
+        },
+    )
+
+    assert pragma(engine, "journal_mode") == "wal"
+    assert pragma(engine, "synchronous") == 1
+    assert pragma(engine, "mmap_size") == 1048576
+    assert pragma(engine, "cache_size") == -2048
+    assert pragma(engine, "temp_store") == 2
+    assert pragma(engine, "busy_timeout") == 1234
+    engine.dispose()
+
+
+def test_make_engine_uses_settings_profile_by_default(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'default.db'}")
+
+    assert pragma(engine, "journal_mode") == "wal"
+    assert pragma(engine, "synchronous") == 1
+    assert pragma(engine, "busy_timeout") == 5000
+    assert pragma(engine, "foreign_keys") == 1
+    engine.dispose()
+
+
+def test_make_engine_without_profile_keeps_sqlite_defaults(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'plain.db'}", {})
+
+    assert pragma(engine, "journal_mode") == "delete"
+    assert pragma(engine, "synchronous") == 2
+    engine.dispose()
+
+
+@pytest.mark.parametrize("factory", [make_engine, make_read_engine])
+def test_non_sqlite_engine_gets_no_sqlite_connect_args(factory):
+    url = "postgresql://reader@replica.example/events"
+
+    with patch("app.models.create_engine") as create:
+        factory(url)
+
+    create.assert_called_once_with(url)
+
+
+def test_read_engine_rejects_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'events.db'}"
+    engine = make_engine(url)
+    create_tables(engine)
+    read_engine = make_read_engine(url)
+
+    with read_engine.connect() as conn:
+        assert conn.scalar(select(CalendarState.version)) == 0
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(update(CalendarState).values(version=1))
+
+    assert pragma(read_engine, "journal_mode") == "wal"
+    assert pragma(read_engine, "query_only") == 1
+    read_engine.dispose()
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite://", True),
+        ("sqlite:///:memory:", True),
+        ("sqlite:///./events.db", False),
+        ("postgresql://replica/events", False),
+    ],
+)
+def test_is_memory_database(url, expected):
+    assert is_memory_database(url) is expected
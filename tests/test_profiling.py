@@ -0,0 +1,63 @@
+import pstats
+from unittest.mock import patch
+
+import pytest
+
+from app import profiling
+
+
+def test_profile_flag_requires_admin_credentials(client, session_factory):
+    response = client.get("/events.ics", headers={"X-Profile": "1"})
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Basic"
+
+
+def test_profile_rejects_wrong_credentials(client, session_factory):
+    response = client.get("/events.ics?profile=1", auth=("admin", "wrong"))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    "request_kwargs",
+    [{"headers": {"X-Profile": "1"}}, {"params": {"profile": "1"}}],
+    ids=["header", "query"],
+)
+def test_profiled_request_returns_report(
+    client, auth_headers, session_factory, request_kwargs
+):
+    kwargs = {**request_kwargs}
+    kwargs["headers"] = {**auth_headers, **kwargs.get("headers", {})}
+
+    response = client.get("/events.ics", **kwargs)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert response.headers["X-Profile-Status"] == "200"
+    assert response.text.startswith("GET /events.ics -> 200 in ")
+    assert "By cumulative time (call tree):" in response.text
+    assert "_build_calendar" in response.text
+
+
+def test_unflagged_request_is_not_profiled(client, auth_headers, session_factory):
+    response = client.get("/events.ics", headers={**auth_headers, "X-Profile": "0"})
+
+    assert response.headers["Content-Type"].startswith("text/calendar")
+    assert "X-Profile-Status" not in response.headers
+
+
+def test_profile_saved_to_profile_dir(client, auth_headers, session_factory, tmp_path):
+    with patch.object(profiling.settings, "profile_dir", tmp_path):
+        response = client.get("/events", headers={**auth_headers, "X-Profile": "1"})
+
+    path = tmp_path / response.headers["X-Profile-File"]
+    stats = pstats.Stats(str(path))
+    assert any(function == "get_events" for _, _, function in stats.stats)
+
+
+def test_concurrent_profile_is_refused(client, auth_headers, session_factory):
+    with profiling._profile_lock:
+        response = client.get("/events.ics", headers={**auth_headers, "X-Profile": "1"})
+
+    assert response.status_code == 409
@@ -0,0 +1,131 @@
+import gzip
+import os
+from datetime import datetime, timezone
+from functools import partial
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import FeedSnapshot
+from app.main import app
+from app.models import Event, bump_calendar_version
+from app.publisher import FeedPublisher, write_atomic
+from app.queries import EventFilters
+from app.routers import calendar as calendar_router
+
+EVENT = {
+    "title": "Published Event",
+    "start_time": "2025-07-01T19:00:00",
+    "end_time": "2025-07-01T21:00:00",
+    "description": "Written to disk",
+    "venue": "Test Venue",
+}
+
+
+@pytest.fixture
+def publisher(tmp_path, session_factory):
+    build = Mock(
+        wraps=partial(
+            calendar_router._build_snapshot,
+            session_factory.kw["bind"],
+            EventFilters(),
+        )
+    )
+    # Long enough that the timer never fires mid-test; tests call flush().
+    publisher = FeedPublisher(tmp_path / "public", build, debounce=60)
+    publisher.install()
+    yield publisher
+    publisher.uninstall()
+    if publisher._timer is not None:
+        publisher._timer.cancel()
+
+
+def test_write_atomic_replaces_file_without_leftovers(tmp_path):
+    path = tmp_path / "events.ics"
+    write_atomic(path, b"old")
+    write_atomic(path, b"new", mtime=1_700_000_000)
+
+    assert path.read_bytes() == b"new"
+    assert os.stat(path).st_mtime == 1_700_000_000
+    assert os.listdir(tmp_path) == ["events.ics"]
+
+
+def test_publish_writes_feed_and_compressed_variants(tmp_path):
+    updated_at = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+    snapshot = FeedSnapshot('"v1"', updated_at, b"BEGIN:VCALENDAR", {"gzip": b"gz"})
+    publisher = FeedPublisher(tmp_path, lambda: snapshot, debounce=0)
+
+    publisher.publish()
+
+    assert (tmp_path / "events.ics").read_bytes() == b"BEGIN:VCALENDAR"
+    assert (tmp_path / "events.ics.gz").read_bytes() == b"gz"
+    assert os.stat(tmp_path / "events.ics").st_mtime == updated_at.timestamp()
+
+
+def test_burst_of_changes_is_published_once(client, auth_headers, publisher):
+    timers = []
+    for index in range(3):
+        response = client.post(
+            "/add-event",
+            json={**EVENT, "title": f"Event {index}"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        timers.append(publisher._timer)
+
+    assert timers[0] is not None
+    assert timers == [timers[0]] * 3
+    publisher.build.assert_not_called()
+
+    publisher.flush()
+    timers[0].join()
+
+    assert publisher._timer is None
+    publisher.build.assert_called_once()
+    feed = (publisher.directory / "events.ics").read_bytes()
+    assert all(f"SUMMARY:Event {index}".encode() in feed for index in range(3))
+    gzipped = (publisher.directory / "events.ics.gz").read_bytes()
+    assert gzip.decompress(gzipped) == feed
+
+
+def test_rolled_back_change_is_not_published(session_factory, publisher):
+    with session_factory() as db:
+        db.add(
+            Event(
+                title="Abandoned",
+                start_time=datetime(2025, 7, 1, 19, 0),
+                end_time=datetime(2025, 7, 1, 21, 0),
+                description="",
+                venue="",
+            )
+        )
+        bump_calendar_version(db)
+        db.rollback()
+        db.commit()
+
+    publisher.flush()
+
+    publisher.build.assert_not_called()
+
+
+def test_flush_publishes_pending_change_immediately(session_factory, publisher):
+    with session_factory() as db:
+        bump_calendar_version(db)
+        db.commit()
+
+    publisher.flush()
+
+    publisher.build.assert_called_once()
+    assert (publisher.directory / "events.ics").exists()
+
+
+def test_app_publishes_feed_on_startup(tmp_path):
+    snapshot = FeedSnapshot('"v1"', None, b"BEGIN:VCALENDAR", {})
+
+    with (
+        patch.object(calendar_router.settings, "publish_dir", tmp_path),
+        patch("app.routers.calendar._build_snapshot", return_value=snapshot),
+        TestClient(app),
+    ):
+        assert (tmp_path / "events.ics").read_bytes() == b"BEGIN:VCALENDAR"
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.models import create_tables
+from app.queries import (
+    EventFilters,
+    events_page_query,
+    expired_events_delete,
+    feed_query,
+    search_query,
+    tag_facets_query,
+)
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    create_tables(engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect)
+    parameters = tuple(str(compiled.params[name]) for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters)
+        return [row.detail for row in rows]
+
+
+HOT_QUERIES = {
+    "cleanup": expired_events_delete(NOW, 1000),
+    "window": feed_query(EventFilters(start=NOW, end=datetime(2025, 8, 1))),
+    "from": feed_query(EventFilters(start=NOW)),
+    "to": feed_query(EventFilters(end=NOW)),
+    "venue": feed_query(EventFilters(venue="Main Hall")),
+    "events_page": events_page_query(EventFilters(), (NOW, 42), 100),
+    "events_page_window": events_page_query(
+        EventFilters(start=NOW, end=datetime(2025, 8, 1)), (NOW, 42), 100
+    ),
+    "venue_window": feed_query(
+        EventFilters(venue="Main Hall", start=NOW, end=datetime(2025, 8, 1))
+    ),
+    "tag": feed_query(EventFilters(tag="music")),
+    "tag_page": events_page_query(EventFilters(tag="music"), (NOW, 42), 100),
+}
+
+
+@pytest.mark.parametrize("statement", HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+def test_hot_queries_use_an_index(engine, statement):
+    plan = query_plan(engine, statement)
+
+    assert not any(detail.startswith("SCAN") for detail in plan), plan
+    assert any(detail.startswith("SEARCH events USING") for detail in plan), plan
+
+
+def test_search_uses_full_text_index(engine):
+    plan = query_plan(
+        engine, search_query('"jazz"*', EventFilters(start=NOW), offset=0, limit=20)
+    )
+
+    assert any(detail.startswith("SCAN events_fts VIRTUAL TABLE") for detail in plan)
+    assert "SEARCH events USING INTEGER PRIMARY KEY (rowid=?)" in plan, plan
+
+
+def test_tag_filter_searches_the_tag_index(engine):
+    plan = query_plan(engine, feed_query(EventFilters(tag="music")))
+
+    assert "SEARCH tags USING COVERING INDEX sqlite_autoindex_tags_1 (name=?)" in plan
+    assert any("ix_event_tags_tag_id_event_id (tag_id=?)" in d for d in plan), plan
+
+
+def test_tag_facets_are_one_grouped_query(engine):
+    plan = query_plan(engine, tag_facets_query(EventFilters()))
+
+    assert not any(detail.startswith("SCAN events") for detail in plan), plan
+    assert any("ix_event_tags_tag_id_event_id" in detail for detail in plan), plan
+
+
+def test_create_tables_adds_indexes_to_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "start_time DATETIME NOT NULL, end_time DATETIME NOT NULL, "
+            "description TEXT NOT NULL, venue VARCHAR NOT NULL, url VARCHAR, "
+            "tags VARCHAR)"
+        )
+
+    create_tables(engine)
+
+    plan = query_plan(engine, expired_events_delete(NOW, 1000))
+    assert any("ix_events_end_time" in detail for detail in plan), plan
+    engine.dispose()
+
+
+def test_first_events_page_walks_the_start_time_index(engine):
+    plan = query_plan(engine, events_page_query(EventFilters(), None, 100))
+
+    assert plan == ["SCAN events USING INDEX ix_events_start_time_id"]
@@ -0,0 +1,83 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app import querylog
+from app.models import Event, bump_calendar_version
+
+
+def add_events(session_factory, count):
+    start = datetime(2025, 7, 1, 19, 0, 0)
+    with session_factory() as db:
+        db.add_all(
+            Event(
+                title=f"Event {index}",
+                start_time=start + timedelta(days=index),
+                end_time=start + timedelta(days=index, hours=2),
+                description="",
+                venue="Test Venue",
+                tags="music,community",
+            )
+            for index in range(count)
+        )
+        bump_calendar_version(db)
+        db.commit()
+
+
+def query_count(response):
+    match = re.fullmatch(
+        r'db;dur=[0-9.]+;desc="(\d+) queries"', response.headers["Server-Timing"]
+    )
+    assert match, response.headers["Server-Timing"]
+    return int(match.group(1))
+
+
+def test_server_timing_reports_request_queries(client, auth_headers, session_factory):
+    response = client.get("/events", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert query_count(response) >= 1
+
+
+def test_read_paths_issue_constant_queries(client, auth_headers, session_factory):
+    add_events(session_factory, 3)
+    small = [
+        query_count(client.get("/events", headers=auth_headers)),
+        query_count(client.get("/events.ics")),
+        query_count(client.get("/tags")),
+    ]
+
+    add_events(session_factory, 30)
+    large = [
+        query_count(client.get("/events", headers=auth_headers)),
+        query_count(client.get("/events.ics")),
+        query_count(client.get("/tags")),
+    ]
+
+    assert large == small
+
+
+def test_slow_queries_are_logged_with_plan(
+    client, auth_headers, session_factory, caplog
+):
+    with (
+        patch.object(querylog.settings, "slow_query_threshold_ms", 1e-9),
+        caplog.at_level(logging.WARNING, logger="app.querylog"),
+    ):
+        client.get("/events?tag=music", headers=auth_headers)
+
+    messages = [record.getMessage() for record in caplog.records]
+    page_query = next(message for message in messages if "FROM events" in message)
+    assert "Parameters: (" in page_query
+    assert "SEARCH events USING" in page_query
+
+
+def test_slow_query_log_can_be_disabled(client, auth_headers, session_factory, caplog):
+    with (
+        patch.object(querylog.settings, "slow_query_threshold_ms", 0),
+        caplog.at_level(logging.WARNING, logger="app.querylog"),
+    ):
+        client.get("/events", headers=auth_headers)
+
+    assert not caplog.records